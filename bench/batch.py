@@ -0,0 +1,98 @@
+"""まとめて検索（orFlag=1）の正確さのベンチマーク（ローカルの代替APIを使用）
+
+1件ずつ検索した最安値と、まとめて検索した最安値が商品ごとに一致するかを比べる。
+
+    python -m bench.batch --rows 2000 --batch-sizes 3 5 9
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from bench.generate import write_inputs
+from bench.mock_api import MockIchibaServer
+from pricecheck.client import IchibaClient
+from pricecheck.ingest import read_master
+from pricecheck.lookup import BATCH_MAX_SIZE, lookup_master
+from pricecheck.metrics import RunMetrics
+
+
+def cheapest(df, url, args, batch_size):
+    """商品コードごとの最安値（見つからなかった商品は None）と計測結果を返す"""
+    client = IchibaClient(url=url, backoff=0.01, pool_size=args.workers)
+    metrics = RunMetrics()
+    started = time.perf_counter()
+    item_columns, failed = lookup_master(df, '部品 中古', 0, rate=args.rate, max_workers=args.workers, client=client, metrics=metrics, batch_size=batch_size)
+    elapsed = time.perf_counter() - started
+    prices = dict.fromkeys(df['商品コード'].astype(str))
+    prices.update(zip(map(str, item_columns['商品コード']), item_columns['itemPrice']))
+    return prices, failed, metrics.summary(), elapsed
+
+
+def compare(baseline, prices):
+    # 1件ずつ検索した結果と最安値（見つからなかったことを含む）が一致しない商品コード
+    return [code for code, price in baseline.items() if prices.get(code) != price]
+
+
+def print_report(report):
+    print(f"{'batch':>6} {'calls':>7} {'fail':>5} {'sec':>7} {'match_rate':>11} {'agreement':>10} {'mismatch':>9}")
+    for r in report:
+        # 1件ずつの検索では振り分け率はない
+        match_rate = f"{r['batch_match_rate']:.1%}" if r['batch_match_rate'] is not None else '-'
+        print(
+            f"{r['batch_size']:>6} {r['api_calls']:>7} {r['failed']:>5} {r['total_sec']:>7.2f} "
+            f"{match_rate:>11} {r['agreement']:>10.1%} {r['mismatches']:>9}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='まとめて検索の正確さのベンチマーク')
+    parser.add_argument('--rows', type=int, default=2000, help='生成する商品マスタの行数')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[3, 5, BATCH_MAX_SIZE], help='まとめて検索するJANコード数')
+    parser.add_argument('--latency', type=float, default=0.0, help='代替APIの平均応答時間（秒）')
+    parser.add_argument('--rate', type=float, default=1000.0, help='API呼び出し上限（回/秒）')
+    parser.add_argument('--workers', type=int, default=16, help='同時接続数')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='結果をJSONで保存するパス')
+    args = parser.parse_args(argv)
+
+    server = MockIchibaServer(latency=args.latency)
+    server_process = server.start_process()
+    report = []
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            master_path = os.path.join(work_dir, 'master.csv')
+            write_inputs(args.rows, master_path, os.path.join(work_dir, 'goods.csv'), args.seed)
+            df = read_master(master_path)
+
+            baseline = None
+            for batch_size in [1] + args.batch_sizes:
+                prices, failed, summary, elapsed = cheapest(df, server.url, args, batch_size)
+                if baseline is None:
+                    baseline = prices
+                mismatches = compare(baseline, prices)
+                report.append({
+                    'batch_size': batch_size,
+                    'api_calls': summary['api_calls'],
+                    'failed': len(failed),
+                    'total_sec': elapsed,
+                    'batch_match_rate': summary['batch_match_rate'],
+                    'agreement': 1 - len(mismatches) / len(baseline) if len(baseline) > 0 else 1.0,
+                    'mismatches': len(mismatches),
+                    'mismatch_codes': mismatches[:20],
+                })
+    finally:
+        server_process.terminate()
+        server.server_close()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    # 1件ずつ検索した結果と一致しない商品があれば終了コード1
+    return 1 if any(r['mismatches'] > 0 for r in report) else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,39 @@
+"""ベンチマーク用の商品マスタ（csv1）と goods（csv2）を生成する"""
+import random
+
+import numpy as np
+import pandas as pd
+
+
+def reference_price(jan):
+    # JANコードごとの基準価格（商品マスタの仕入単価と、代替APIの出品価格の基準にする）
+    return random.Random(str(jan)).randint(100, 20000)
+
+
+def generate_master(n, seed=0):
+    rng = np.random.default_rng(seed)
+    # 1割程度は同じJANコードのサイズ・入数違いの商品にする
+    jan = 4900000000000 + rng.integers(0, max(1, int(n * 0.9)), n)
+    cost = (np.array([reference_price(j) for j in jan]) * rng.uniform(0.9, 1.1, n)).astype(int)
+    return pd.DataFrame({
+        '商品コード': [f'B{i:06d}' for i in range(n)],
+        '商品名': [f'テスト商品{i}' for i in range(n)],
+        'JANコード': jan,
+        '通販単価': (cost * rng.uniform(1.2, 2.0, n)).astype(int),
+        '仕入単価': cost,
+        '税率区分名': rng.choice(['課税', '軽減税率'], n),
+        '商品分類6名': rng.choice(['送料無料', '送料別'], n),
+    })
+
+
+def generate_goods(master, seed=0, selling=0.8):
+    # 販売中（goodsに含まれる）の商品を一部だけ残す
+    rng = np.random.default_rng(seed + 1)
+    codes = master['商品コード'][rng.random(len(master)) < selling]
+    return pd.DataFrame({'商品コード': codes, '販売状態': '販売中'})
+
+
+def write_inputs(n, master_path, goods_path, seed=0):
+    master = generate_master(n, seed)
+    master.to_csv(master_path, index=False, encoding='utf-8')
+    generate_goods(master, seed).to_csv(goods_path, index=False, encoding='cp932')
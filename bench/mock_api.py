@@ -0,0 +1,150 @@
+"""楽天市場 商品検索APIのローカル代替サーバー（ベンチマーク用）
+
+    python -m bench.mock_api --port 8765 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from bench.generate import reference_price
+from pricecheck.lookup import OWN_SHOP
+
+SEARCH_PATH = '/services/api/IchibaItem/Search/20170706'
+
+
+def listings(keyword):
+    """キーワード（JANコード）ごとの出品（検索条件によらず同じ）
+
+    価格は generate の基準価格の 0.9〜2.5 倍。orFlag=1 でまとめて検索しても、各商品には1つのJANコードだけが入る。
+    """
+    rng = random.Random(keyword)
+    price = reference_price(keyword)
+    items = []
+    for i in range(rng.randint(0, 40)):
+        items.append({
+            'shopName': OWN_SHOP if rng.random() < 0.1 else f'ショップ{rng.randint(1, 500)}',
+            'itemCode': f'shop:{keyword}-{i}',
+            'itemName': f'{keyword} テスト商品 {i}',
+            'itemCaption': f'JANコード: {keyword}',
+            'itemPrice': int(price * rng.uniform(0.9, 2.5)),
+            'pointRate': rng.choice([1, 1, 1, 2, 5, 10]),
+            'postageFlag': rng.randint(0, 1),
+            'itemUrl': f'https://item.rakuten.co.jp/test/{keyword}-{i}/',
+            'reviewCount': rng.randint(0, 300),
+            'reviewAverage': round(rng.uniform(3, 5), 2),
+            'endTime': '',
+            'mediumImageUrls': [f'https://thumbnail.image.rakuten.co.jp/test/{i}.jpg'],
+        })
+    return items
+
+
+def synthetic_response(params):
+    # orFlag=1 は空白区切りの各キーワードの出品を合わせて、価格の安い順に返す
+    keyword = params.get('keyword', '')
+    keywords = keyword.split() if str(params.get('orFlag', '0')) == '1' else [keyword]
+    min_price = int(params.get('minPrice', 1))
+    max_price = int(params.get('maxPrice', 999999))
+    hits = int(params.get('hits', 30))
+    page = int(params.get('page', 1))
+
+    items = [item for k in keywords for item in listings(k) if min_price <= item['itemPrice'] <= max_price]
+    items.sort(key=lambda item: item['itemPrice'])
+    start = (page - 1) * hits
+    return {'count': len(items), 'page': page, 'hits': hits, 'Items': items[start:start + hits]}
+
+
+class MockIchibaHandler(BaseHTTPRequestHandler):
+    # 本番APIと同じく keep-alive で接続を使い回せるようにする
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        if url.path != SEARCH_PATH:
+            self.send_error(404)
+            return
+
+        time.sleep(max(0.0, random.gauss(server.latency, server.latency * 0.2)))
+        if random.random() < server.error_rate:
+            # 429 と 500 を半々で返す
+            if random.random() < 0.5:
+                self.reply(429, {'error': 'too_many_requests', 'error_description': 'number of allowed requests has been exceeded for this API.'}, {'Retry-After': '0'})
+            else:
+                self.reply(500, {'error': 'system_error', 'error_description': 'api logic error'})
+            return
+
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        body = server.recorded.get(params.get('keyword')) or synthetic_response(params)
+        self.reply(200, body)
+
+    def reply(self, status, body, headers=None):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockIchibaServer(ThreadingHTTPServer):
+    """latency（秒）と error_rate を指定できる検索APIの代替サーバー
+
+    recorded にキーワード: レスポンスの辞書を渡すと、そのキーワードは記録済みの応答を返す。
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.05, error_rate=0.0, recorded=None):
+        super().__init__(('127.0.0.1', port), MockIchibaHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.recorded = recorded or {}
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}{SEARCH_PATH}'
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def start_process(self):
+        # 計測対象とGILを取り合わないよう、別プロセスで応答する
+        process = multiprocessing.get_context('fork').Process(target=self.serve_forever, daemon=True)
+        process.start()
+        return process
+
+
+def load_recorded(path):
+    if path is None:
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='楽天市場 商品検索APIの代替サーバー')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05, help='応答までの平均待ち時間（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='429/500 を返す割合')
+    parser.add_argument('--recorded', help='記録済みレスポンス（キーワード: レスポンスのJSON）')
+    args = parser.parse_args(argv)
+
+    server = MockIchibaServer(args.port, args.latency, args.error_rate, load_recorded(args.recorded))
+    print(f'listening on {server.url}')
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
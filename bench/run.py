@@ -0,0 +1,121 @@
+"""csv検索・価格更新ファイル作成のベンチマーク（ローカルの代替APIを使用）
+
+    python -m bench.run --sizes 1000 10000 100000 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import json
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bench.generate import write_inputs
+from bench.mock_api import MockIchibaServer, load_recorded
+from pricecheck.client import IchibaClient
+from pricecheck.export import bundle_bytes, csv_bytes
+from pricecheck.ingest import read_master
+from pricecheck.lookup import lookup_master
+from pricecheck.metrics import RunMetrics
+from pricecheck.results import build_results, split_results
+from pricecheck.view import PAGE_SIZES, highlight_shop
+
+STAGES = ['ingest', 'fetch', 'price', 'render', 'export']
+
+
+def run_once(n, url, args, work_dir):
+    """1サイズ分を計測する（ピークメモリを分けて測るため、サイズごとに別プロセスで実行）"""
+    master_path = os.path.join(work_dir, f'master_{n}.csv')
+    goods_path = os.path.join(work_dir, f'goods_{n}.csv')
+    write_inputs(n, master_path, goods_path, args.seed)
+
+    client = IchibaClient(url=url, backoff=0.01, pool_size=args.workers)
+    metrics = RunMetrics()
+
+    started = time.perf_counter()
+    with metrics.stage('ingest'):
+        df = read_master(master_path, goods_path)
+
+    with metrics.stage('fetch'):
+        item_columns, failed = lookup_master(df, '部品 中古', 0, rate=args.rate, max_workers=args.workers, client=client, metrics=metrics)
+
+    with metrics.stage('price'):
+        df_result = build_results(item_columns)
+
+    # 画面表示は1ページ分のスタイル適用まで（st.dataframe に渡す直前）
+    with metrics.stage('render'):
+        df_view, df_csv = split_results(df_result)
+        df_view.iloc[:PAGE_SIZES[0]].style.apply(highlight_shop, axis=1).format({'最安時粗利率': "{:.2f}"}).to_html()
+
+    with metrics.stage('export'):
+        result_csv = csv_bytes(df_csv)
+        df00 = df_csv.copy()
+        df00['変更価格'] = df00['推奨価格']
+        export_bytes = len(bundle_bytes(df00))
+
+    total = time.perf_counter() - started
+    # Linux の ru_maxrss はKB単位
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    summary = metrics.summary()
+    return {
+        'rows': len(df),
+        'results': len(df_result),
+        'failed': len(failed),
+        'api_calls': summary['api_calls'],
+        'retries': summary['retries'],
+        'rows_per_sec': len(df) / total if total > 0 else 0,
+        'lookup_p50_ms': summary['latency_p50_ms'],
+        'lookup_p95_ms': summary['latency_p95_ms'],
+        'peak_memory_mb': peak / 1024 / 1024,
+        'result_csv_bytes': len(result_csv),
+        'export_bytes': export_bytes,
+        'total_sec': total,
+        'stages_sec': summary['stages_sec'],
+    }
+
+
+def print_report(report):
+    print(f"{'rows':>8} {'rows/s':>9} {'calls':>7} {'fail':>5} {'p50ms':>7} {'p95ms':>7} {'peakMB':>8} " + ' '.join(f'{s:>8}' for s in STAGES))
+    for r in report:
+        print(
+            f"{r['rows']:>8} {r['rows_per_sec']:>9.1f} {r['api_calls']:>7} {r['failed']:>5} "
+            f"{r['lookup_p50_ms']:>7.1f} {r['lookup_p95_ms']:>7.1f} {r['peak_memory_mb']:>8.1f} "
+            + ' '.join(f"{r['stages_sec'][s]:>8.2f}" for s in STAGES)
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='csv検索・価格更新ファイル作成のベンチマーク')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='生成する商品マスタの行数')
+    parser.add_argument('--latency', type=float, default=0.05, help='代替APIの平均応答時間（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='代替APIが 429/500 を返す割合')
+    parser.add_argument('--recorded', help='記録済みレスポンス（キーワード: レスポンスのJSON）')
+    parser.add_argument('--rate', type=float, default=1000.0, help='API呼び出し上限（回/秒）')
+    parser.add_argument('--workers', type=int, default=16, help='同時接続数')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='結果をJSONで保存するパス')
+    args = parser.parse_args(argv)
+
+    server = MockIchibaServer(latency=args.latency, error_rate=args.error_rate, recorded=load_recorded(args.recorded))
+    server_process = server.start_process()
+    report = []
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            for n in args.sizes:
+                with ProcessPoolExecutor(max_workers=1) as executor:
+                    report.append(executor.submit(run_once, n, server.url, args, work_dir).result())
+                print_report(report[-1:])
+    finally:
+        server_process.terminate()
+        server.server_close()
+
+    print()
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
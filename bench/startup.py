@@ -0,0 +1,97 @@
+"""アプリの起動時間のベンチマーク（機能ごとに新しいプロセスで計測）
+
+    python -m bench.startup --repeat 3
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '楽天商品価格検索.py')
+COLUMNS = ['import_streamlit', 'first_run', 'mode_run', 'rerun']
+
+# 最初の画面（個別検索）で読み込まないモジュール（csv検索・価格更新ファイル作成の処理）
+FIRST_RUN_EXCLUDES = ['pricecheck.jobs', 'pricecheck.export', 'pricecheck.ingest', 'pricecheck.schedule']
+
+
+def measure(mode):
+    """1つの機能を、モジュールを読み込んでいない新しいプロセスで計測する（秒）
+
+    import_streamlit は streamlit の読み込み、first_run は最初の画面（個別検索）の表示、
+    mode_run はその機能を初めて選んだときの表示（機能のモジュールの読み込みを含む）、rerun は同じ機能の再実行。
+    最初の画面で FIRST_RUN_EXCLUDES のモジュールを読み込んでいた場合は RuntimeError。
+    """
+    sys.path.insert(0, os.path.dirname(SCRIPT))
+    started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    imported = time.perf_counter()
+
+    at = AppTest.from_file(SCRIPT, default_timeout=60)
+    at.run()
+    first_run = time.perf_counter()
+
+    # AppTest は同じプロセスでスクリプトを実行するため、読み込んだモジュールは sys.modules で確認できる
+    loaded = [name for name in FIRST_RUN_EXCLUDES if name in sys.modules]
+    if loaded:
+        raise RuntimeError(f"最初の画面で {', '.join(loaded)} を読み込んでいます")
+
+    at.sidebar.radio[0].set_value(mode)
+    mode_started = time.perf_counter()
+    at.run()
+    mode_run = time.perf_counter()
+
+    at.run()
+    rerun = time.perf_counter()
+
+    if at.exception:
+        raise RuntimeError(f'{mode}: {at.exception[0].message}')
+    return {
+        'mode': mode,
+        'import_streamlit': imported - started,
+        'first_run': first_run - imported,
+        'mode_run': mode_run - mode_started,
+        'rerun': rerun - mode_run,
+    }
+
+
+def print_report(report):
+    print(f"{'mode':<14}" + ' '.join(f'{c:>16}' for c in COLUMNS))
+    for r in report:
+        print(f"{r['mode']:<14}" + ' '.join(f'{r[c]:>16.3f}' for c in COLUMNS))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='アプリの起動時間のベンチマーク')
+    parser.add_argument('--modes', nargs='+', help='計測する機能（省略時はすべて）')
+    parser.add_argument('--repeat', type=int, default=3, help='機能ごとの計測回数（中央値を表示）')
+    parser.add_argument('--json', help='結果をJSONで保存するパス')
+    args = parser.parse_args(argv)
+
+    from pricecheck.modes import MODES
+    modes = args.modes or list(MODES)
+
+    # fork では親プロセスの読み込み済みモジュールを引き継ぐため、spawn で毎回新しいプロセスを作る
+    context = multiprocessing.get_context('spawn')
+    report = []
+    for mode in modes:
+        runs = []
+        for _ in range(args.repeat):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                runs.append(executor.submit(measure, mode).result())
+        report.append({
+            'mode': mode,
+            **{c: statistics.median(r[c] for r in runs) for c in COLUMNS},
+        })
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
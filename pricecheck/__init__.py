@@ -0,0 +1 @@
+# 楽天市場 最安値価格検索の共通処理
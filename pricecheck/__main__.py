@@ -0,0 +1,5 @@
+import sys
+
+from pricecheck.cli import main
+
+sys.exit(main())
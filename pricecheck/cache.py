@@ -0,0 +1,72 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'ichiba.sqlite3')
+DEFAULT_TTL = 12 * 60 * 60
+DEFAULT_MAX_ENTRIES = 200000
+
+
+def cache_key(search_params):
+    # applicationId を除き、値を文字列にそろえて正規化したキー
+    normalized = {k: str(v) for k, v in search_params.items() if k != 'applicationId'}
+    return json.dumps(normalized, ensure_ascii=False, sort_keys=True)
+
+
+class ResponseCache:
+    """検索APIレスポンスのSQLiteキャッシュ（TTL付き・件数上限でLRU削除）"""
+
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, body TEXT NOT NULL, '
+                'created_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+
+    def get(self, search_params):
+        key = cache_key(search_params)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute('SELECT body, created_at FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            # 有効期限切れは削除して未取得扱い
+            if now - row[1] > self.ttl:
+                self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                return None
+            self._conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+        return json.loads(row[0])
+
+    def put(self, search_params, result):
+        key = cache_key(search_params)
+        now = time.time()
+        body = json.dumps(result, ensure_ascii=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, body, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, body, now, now),
+            )
+            # 上限を超えた分は最終参照が古いものから削除
+            count = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    'DELETE FROM responses WHERE key IN ('
+                    'SELECT key FROM responses ORDER BY accessed_at LIMIT ?)',
+                    (count - self.max_entries,),
+                )
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM responses')
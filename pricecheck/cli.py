@@ -0,0 +1,193 @@
+"""価格調査・価格更新ファイル作成をブラウザなしで実行する
+
+    python -m pricecheck search 商品マスタ.csv [goods.csv] -o 出力先
+    python -m pricecheck export 価格調査結果.csv -o 出力先
+    python -m pricecheck diff 前回の価格調査結果.csv 今回の価格調査結果.csv -o 出力先
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from pricecheck.cache import DEFAULT_TTL, ResponseCache
+from pricecheck.diff import REPORT_FILE, compare_results, moved, read_results, summarize
+from pricecheck.export import csv_bytes, iter_update_files, write_csv
+from pricecheck.history import PriceHistory
+from pricecheck.ingest import read_master
+from pricecheck.journal import RunJournal, run_id_for
+from pricecheck.lookup import BATCH_MAX_SIZE, DEFAULT_WORKERS, KEYWORD_MAX_LENGTH, lookup_master
+from pricecheck.metrics import RunMetrics
+from pricecheck.quota import DEFAULT_PATH as QUOTA_PATH, QuotaGovernor, app_ids_from_env, rate_from_env
+from pricecheck.results import build_results, select_rows, split_results
+from pricecheck.schedule import plan_refresh
+
+
+def write_file(out_dir, file_name, data):
+    path = os.path.join(out_dir, file_name)
+    with open(path, 'wb') as f:
+        f.write(data)
+    print(f'出力: {path}', file=sys.stderr)
+
+
+def write_update_files(df00, out_dir):
+    # 各モールのファイルを1つずつ作成し、Shift_JISで書き出す
+    for file_name, df in iter_update_files(df00):
+        path = os.path.join(out_dir, file_name)
+        with open(path, 'wb') as f:
+            write_csv(df, f)
+        print(f'出力: {path}', file=sys.stderr)
+
+
+class ProgressLog:
+    """一定間隔で進捗を標準エラーに出力する"""
+
+    def __init__(self, total, interval=10.0):
+        self.total = total
+        self.interval = interval
+        self.count = 0
+        self.started = time.monotonic()
+        self.logged = self.started
+
+    def __call__(self, row, item, error):
+        self.count += 1
+        now = time.monotonic()
+        if self.count == self.total or now - self.logged >= self.interval:
+            speed = self.count / (now - self.started) if now > self.started else 0
+            print(f'{self.count} / {self.total} 件（{speed:.1f} 件/秒）', file=sys.stderr)
+            self.logged = now
+
+
+def run_search(args):
+    with open(args.master, 'rb') as f:
+        master_bytes = f.read()
+    goods_bytes = b''
+    if args.goods is not None:
+        with open(args.goods, 'rb') as f:
+            goods_bytes = f.read()
+
+    metrics = RunMetrics()
+    with metrics.stage('ingest'):
+        df = read_master(args.master, args.goods)
+
+    cache = None if args.no_cache else ResponseCache(ttl=args.cache_ttl)
+    # 途中で止まった実行の続きから検索する（最後まで検索できた実行は最初から検索し直す）
+    journal = RunJournal(run_id_for(master_bytes, goods_bytes, args.ng_keyword))
+    if args.refresh or journal.finished():
+        journal.reset()
+    resumed = len(journal.completed())
+    if resumed > 0:
+        print(f'前回の途中結果 {resumed} 件を再利用', file=sys.stderr)
+
+    # 上限があれば、過去の最安値の履歴から優先度の高い商品のみ検索する
+    history = PriceHistory()
+    if args.budget > 0:
+        total = len(df)
+        df = plan_refresh(df, history.stats(exclude_run_id=journal.run_key()), args.budget)
+        print(f'優先度の高い {len(df)} / {total} 件を検索', file=sys.stderr)
+
+    # アプリIDごとに --rate 回/秒まで（同じマシンのStreamlitサーバーとも上限を共有する）
+    app_ids = [app_id.strip() for app_id in args.app_id.split(',') if app_id.strip()]
+    limiter = QuotaGovernor(app_ids, rate=args.rate, path=QUOTA_PATH).share()
+
+    with metrics.stage('fetch'):
+        item_columns, failed = lookup_master(
+            df, args.ng_keyword, app_ids[0], max_workers=args.workers,
+            cache=cache, refresh=args.refresh, journal=journal, on_result=ProgressLog(len(df)), metrics=metrics, limiter=limiter,
+            batch_size=args.batch,
+        )
+    if len(failed) == 0:
+        journal.finish()
+    summary = metrics.summary()
+    if summary['batch_jans'] > 0:
+        print(f"振り分け率: {summary['batch_match_rate']:.1%}（まとめて検索 {summary['batch_jans']} 件）", file=sys.stderr)
+    for row in failed:
+        print(f"取得失敗: {row['商品コード']} ({row['JANコード']}) {row['エラー']}", file=sys.stderr)
+
+    with metrics.stage('price'):
+        df_result = build_results(item_columns)
+
+        # 最安値の履歴を記録し、--changed-only なら前回から変わった商品のみ出力する
+        run_key = journal.run_key()
+        changed = history.changed(df_result, run_key)
+        # 検索して見つからなかった商品も記録する（取得に失敗した行は除く）
+        failed_codes = [str(row['商品コード']) for row in failed]
+        history.record(run_key, df_result, searched=df[~df['商品コード'].astype(str).isin(failed_codes)])
+        if args.changed_only:
+            print(f'前回から変更があった商品: {changed.sum()} / {len(df_result)} 件', file=sys.stderr)
+            df_result = select_rows(df_result, changed)
+
+        _, df_result = split_results(df_result)
+
+    with metrics.stage('export'):
+        today_date_8digit = datetime.today().strftime('%Y%m%d')
+        write_file(args.out, f'{today_date_8digit}価格調査結果.csv', csv_bytes(df_result))
+
+        # 変更価格は手入力の列のため、ここでは推奨価格で更新ファイルを作る
+        df00 = df_result.copy()
+        df00['変更価格'] = df00['推奨価格']
+        write_update_files(df00, args.out)
+
+    if args.metrics is not None:
+        with open(args.metrics, 'w', encoding='utf-8') as f:
+            f.write(metrics.to_json())
+    return 1 if len(failed) > 0 else 0
+
+
+def run_export(args):
+    df00 = pd.read_csv(args.results, encoding='utf-8')
+    write_update_files(df00, args.out)
+    return 0
+
+
+def run_diff(args):
+    df_diff = compare_results(read_results(args.before), read_results(args.after))
+    write_file(args.out, REPORT_FILE, csv_bytes(moved(df_diff)))
+    for name, value in summarize(df_diff).items():
+        print(f'{name}: {value:.2%}' if isinstance(value, float) else f'{name}: {value}', file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='pricecheck', description='楽天市場 最安値価格検索')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    search_parser = subparsers.add_parser('search', help='商品マスタの各商品の最安値を検索し、価格調査結果と価格更新ファイルを出力')
+    search_parser.add_argument('master', help='汎用明細T9999：商品マスタ（UTF-8）')
+    search_parser.add_argument('goods', nargs='?', help='goods：商品エクスポート（CP932）。指定すると販売中の商品のみ検索')
+    search_parser.add_argument('-o', '--out', default='.', help='出力先ディレクトリ')
+    search_parser.add_argument('--ng-keyword', default='部品 中古', help='除外ワード')
+    search_parser.add_argument('--app-id', default=','.join(app_ids_from_env()), help='楽天アプリID。カンマ区切りで複数指定可（環境変数 RAKUTEN_APP_IDS / RAKUTEN_APP_ID でも指定可）')
+    search_parser.add_argument('--rate', type=float, default=rate_from_env(), help='アプリIDごとのAPI呼び出し上限（回/秒）（環境変数 RAKUTEN_API_RATE でも指定可）')
+    search_parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='同時接続数')
+    search_parser.add_argument('--cache-ttl', type=int, default=DEFAULT_TTL, help='キャッシュ有効期限（秒）')
+    search_parser.add_argument('--no-cache', action='store_true', help='キャッシュを使わない')
+    search_parser.add_argument('--refresh', action='store_true', help='キャッシュ・途中結果を使わず再取得')
+    search_parser.add_argument('--batch', type=int, default=1, help=f'orFlag=1 で1回にまとめて検索するJANコード数（1: まとめない・{BATCH_MAX_SIZE}まで）')
+    search_parser.add_argument('--changed-only', action='store_true', help='前回から 最安値・ショップ・推奨価格 が変わった商品のみ出力')
+    search_parser.add_argument('--budget', type=int, default=0, help='1回の検索数（JANコード数）の上限。超える場合は優先度の高い商品から検索')
+    search_parser.add_argument('--metrics', help='処理時間・API呼び出しの計測結果を書き出すJSONのパス')
+    search_parser.set_defaults(func=run_search)
+
+    export_parser = subparsers.add_parser('export', help='価格調査結果から価格更新ファイルを出力')
+    export_parser.add_argument('results', help='価格調査結果CSV（変更価格を入力済み）')
+    export_parser.add_argument('-o', '--out', default='.', help='出力先ディレクトリ')
+    export_parser.set_defaults(func=run_export)
+
+    diff_parser = subparsers.add_parser('diff', help='2つの価格調査結果を比較し、変化があった商品のレポートを出力')
+    diff_parser.add_argument('before', help='前回の価格調査結果CSV')
+    diff_parser.add_argument('after', help='今回の価格調査結果CSV')
+    diff_parser.add_argument('-o', '--out', default='.', help='出力先ディレクトリ')
+    diff_parser.set_defaults(func=run_diff)
+
+    args = parser.parse_args(argv)
+    if args.command == 'search' and not 1 <= args.batch <= BATCH_MAX_SIZE:
+        parser.error(f'--batch は 1 から {BATCH_MAX_SIZE} まで（検索キーワードは{KEYWORD_MAX_LENGTH}文字まで）')
+    os.makedirs(args.out, exist_ok=True)
+    try:
+        return args.func(args)
+    except ValueError as e:
+        print(f'エラー: {e}', file=sys.stderr)
+        return 2
@@ -0,0 +1,96 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+REQUEST_URL = "https://app.rakuten.co.jp/services/api/IchibaItem/Search/20170706"
+APP_ID = 1027604414937000350
+
+DEFAULT_TIMEOUT = (5, 15)
+DEFAULT_RETRIES = 4
+DEFAULT_BACKOFF = 1.0
+DEFAULT_POOL_SIZE = 16
+
+
+class IchibaAPIError(Exception):
+    """リトライしても検索APIの応答が得られなかった"""
+
+
+def retry_after(response):
+    # Retry-After ヘッダー（秒）があればその値を使う
+    value = response.headers.get('Retry-After')
+    try:
+        return max(float(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+class IchibaClient:
+    """接続を使い回す検索APIクライアント（タイムアウト・指数バックオフ付き）"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, pool_size=DEFAULT_POOL_SIZE, url=REQUEST_URL):
+        self.url = url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, search_params, limiter=None, metrics=None):
+        """検索結果のJSONを返す（429・5xx・通信エラーはリトライ、JSONでない応答は IchibaAPIError）
+
+        limiter.acquire() がアプリIDを返す場合（QuotaGovernor）は、そのアプリIDで呼び出す。
+        metrics を渡すと、通信時間（レート制限・リトライの待ち時間を除く）・ステータス・リトライ回数を記録する。
+        """
+        elapsed = 0.0
+        status = None
+        for attempt in range(self.max_retries + 1):
+            params = search_params
+            if limiter is not None:
+                app_id = limiter.acquire()
+                if app_id is not None:
+                    params = {**search_params, 'applicationId': app_id}
+            wait = self.backoff * 2 ** attempt
+            started = time.perf_counter()
+            try:
+                response = self.session.get(self.url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                elapsed += time.perf_counter() - started
+                status = None
+                error = f'通信エラー: {e}'
+            else:
+                elapsed += time.perf_counter() - started
+                status = response.status_code
+                if status == 429 or status >= 500:
+                    error = f'HTTP {status}'
+                    # 429 は指定された待ち時間を優先する
+                    wait = retry_after(response) or wait
+                else:
+                    if metrics is not None:
+                        metrics.record_call(search_params.get('keyword'), elapsed, status, attempt)
+                    # プロキシ・CDNのエラーページなど、JSONでない応答はその行の取得失敗にする
+                    try:
+                        return response.json()
+                    except ValueError:
+                        raise IchibaAPIError(f'HTTP {status}: JSONでない応答')
+            if attempt < self.max_retries:
+                time.sleep(wait)
+        if metrics is not None:
+            metrics.record_call(search_params.get('keyword'), elapsed, status, self.max_retries)
+        raise IchibaAPIError(error)
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def shared_client():
+    # プロセス内で1つのクライアント（コネクションプール）を共有する
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = IchibaClient()
+        return _shared_client
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from pricecheck.pricing import TARGET_MARGIN
+
+# 比較に使う列（価格調査結果CSV・保存した実行のどちらにもある列）
+COMPARE_COLUMNS = ['最安値', 'ショップ', '最安時粗利率', '推奨価格']
+RESULT_DTYPES = {'商品コード': 'str', '商品名': 'str', 'ショップ': 'str', '最安値': 'float64', '最安時粗利率': 'float64', '推奨価格': 'float64'}
+
+# 変動の区分
+NEW = '新規'
+GONE = '取得なし'
+PRICE_DOWN = '値下がり'
+PRICE_UP = '値上がり'
+SHOP_CHANGED = 'ショップ変更'
+UNCHANGED = '変更なし'
+
+REPORT_FILE = '価格変動レポート.csv'
+
+
+def read_results(file):
+    """価格調査結果CSVから比較に使う列だけを読み込む（商品名のリンクは外す）"""
+    df = pd.read_csv(file, encoding='utf-8-sig', usecols=list(RESULT_DTYPES), dtype=RESULT_DTYPES)
+    df['商品名'] = df['商品名'].str.extract(r'>([^<]*)</a>', expand=False).fillna(df['商品名'])
+    return df
+
+
+def compare_results(df_before, df_after):
+    """2つの結果を商品コードで突き合わせ、最安値・ショップ・粗利率の変化を1行1商品で返す"""
+    before = df_before.drop_duplicates('商品コード', keep='last').set_index('商品コード')
+    after = df_after.drop_duplicates('商品コード', keep='last').set_index('商品コード')
+    joined = before[COMPARE_COLUMNS].join(after[COMPARE_COLUMNS], how='outer', lsuffix='(前回)', rsuffix='(今回)')
+
+    price_before = joined['最安値(前回)'].to_numpy(dtype=float)
+    price_after = joined['最安値(今回)'].to_numpy(dtype=float)
+    in_before = ~np.isnan(price_before)
+    in_after = ~np.isnan(price_after)
+
+    joined['価格差分'] = price_after - price_before
+    joined['変動率'] = joined['価格差分'] / price_before
+    joined['粗利率差分'] = joined['最安時粗利率(今回)'] - joined['最安時粗利率(前回)']
+    shop_changed = in_before & in_after & (joined['ショップ(前回)'].to_numpy() != joined['ショップ(今回)'].to_numpy())
+
+    joined['区分'] = np.select(
+        [~in_before, ~in_after, price_after < price_before, price_after > price_before, shop_changed],
+        [NEW, GONE, PRICE_DOWN, PRICE_UP, SHOP_CHANGED],
+        default=UNCHANGED,
+    )
+    # 前回は粗利率の基準（推奨価格の目標）以上だったが、今回は下回った商品
+    joined['粗利率基準割れ'] = (joined['最安時粗利率(前回)'] >= TARGET_MARGIN) & (joined['最安時粗利率(今回)'] < TARGET_MARGIN)
+
+    # 商品名は今回の結果を優先し、今回取得できなかった商品は前回の結果から
+    if '商品名' in after and '商品名' in before:
+        joined.insert(0, '商品名', after['商品名'].reindex(joined.index).fillna(before['商品名'].reindex(joined.index)))
+    return joined.reset_index()
+
+
+def moved(df_diff):
+    """変化があった商品のみ（変動率の大きい順）"""
+    df_moved = df_diff[df_diff['区分'] != UNCHANGED]
+    return df_moved.sort_values('変動率', key=lambda s: s.abs(), ascending=False, na_position='last')
+
+
+def summarize(df_diff):
+    """区分ごとの件数と、価格の変化の集計"""
+    both = df_diff[df_diff['区分'].isin([PRICE_DOWN, PRICE_UP, SHOP_CHANGED, UNCHANGED])]
+    counts = df_diff['区分'].value_counts()
+    return {
+        '商品数': len(df_diff),
+        **{status: int(counts.get(status, 0)) for status in [PRICE_DOWN, PRICE_UP, SHOP_CHANGED, NEW, GONE, UNCHANGED]},
+        '粗利率基準割れ': int(df_diff['粗利率基準割れ'].sum()),
+        '平均変動率': float(both['変動率'].mean()) if len(both) > 0 else 0.0,
+        '変動率の中央値': float(both['変動率'].median()) if len(both) > 0 else 0.0,
+    }
@@ -0,0 +1,157 @@
+import io
+import zipfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# 自社サイトの会員ランクとポイント付与率
+MEMBER_TIERS = [
+    ('通常会員', 0.01),
+    ('シルバー会員', 0.01),
+    ('ゴールド会員', 0.02),
+    ('プラチナ会員', 0.03),
+]
+SALE_END_DATE = '2050/12/31 23:59'
+
+RAKUTEN_FILE = '楽天アップロード用.csv'
+YAHOO_FILE = 'Yahooアップロード用.csv'
+TONYA_FILE = '自社アップロード用.csv'
+BUNDLE_FILE = '価格更新ファイル.zip'
+
+# 各モールのアップロードファイルの文字コード
+UPLOAD_ENCODING = 'cp932'
+
+# 価格更新ファイルの作成に使う列
+PRICE_TABLE_COLUMNS = ['商品コード', '通販単価', '変更価格', '税率区分名']
+
+RAKUTEN_COLUMNS = ['商品管理番号（商品URL）', '商品番号', 'SKU管理番号', 'システム連携用SKU番号', 'バリエーション項目キー1', 'バリエーション項目キー2', 'バリエーション項目選択肢1', 'バリエーション項目選択肢2', '通常購入販売価格', '表示価格', '二重価格文言管理番号']
+
+
+def build_rakuten(df00):
+    """楽天アップロード用データ（商品行とSKU行の2行1組）を作成する"""
+    code = df00['商品コード'].reset_index(drop=True)
+    code_str = code.astype(str)
+
+    # 商品行：商品番号のみ、価格・SKU関連は空欄
+    parent = pd.DataFrame({
+        '商品管理番号（商品URL）': code,
+        '商品番号': code_str,
+        'SKU管理番号': np.nan,
+        'システム連携用SKU番号': np.nan,
+        '通常購入販売価格': np.nan,
+        '表示価格': np.nan,
+        '二重価格文言管理番号': np.nan,
+    })
+
+    # SKU行：価格・SKU関連を入れる
+    # 販売価格はstr型に変換（int型だとNaNを入れられないため）
+    sku = pd.DataFrame({
+        '商品管理番号（商品URL）': code,
+        '商品番号': code_str,
+        'SKU管理番号': code_str,
+        'システム連携用SKU番号': code_str,
+        '通常購入販売価格': df00['変更価格'].reset_index(drop=True).astype(str),
+        '表示価格': df00['通販単価'].reset_index(drop=True).astype(str),
+        '二重価格文言管理番号': str(1),
+    })
+
+    # 商品行・SKU行の順に並ぶよう、連結してから商品管理番号で安定ソート
+    df01 = pd.concat([parent, sku], ignore_index=True)
+    df01 = df01.sort_values(by='商品管理番号（商品URL）', kind='stable')
+
+    # 通常購入販売価格に値が入っている場合、商品番号をNaNにする
+    df01.loc[df01['通常購入販売価格'].notna(), '商品番号'] = np.nan
+
+    for column in ['バリエーション項目キー1', 'バリエーション項目キー2', 'バリエーション項目選択肢1', 'バリエーション項目選択肢2']:
+        df01[column] = np.nan
+    return df01[RAKUTEN_COLUMNS]
+
+
+def build_yahoo(df00):
+    """Yahoo用データを作成する"""
+    df02 = df00[['商品コード', '通販単価', '変更価格']]
+    df02 = df02.rename(columns={'商品コード': 'code', '通販単価': 'original-price', '変更価格': 'price'})
+
+    # 販売価格をstr型に変換（int型だとNaNを入れられないため）
+    df02['original-price'] = df02['original-price'].astype(str)
+    df02['price'] = df02['price'].astype(str)
+    return df02
+
+
+def build_tonya(df00, now=None):
+    """自社サイト用データ（会員ランクごとの価格・ポイント）を作成する"""
+    now = now or datetime.now()
+    # 月や日、時間をゼロパディングなしにする
+    start_date = f"{now.year}/{now.month}/{now.day} 00:00"
+
+    price = df00['通販単価'].to_numpy()
+    sale_price = df00['変更価格'].to_numpy()
+    if pd.isna(sale_price).any():
+        raise ValueError('変更価格が入力されていない商品があります')
+    tax = np.where(df00['税率区分名'].to_numpy() == '課税', 1.1, 1.08)[:, None]
+    rates = np.array([rate for _, rate in MEMBER_TIERS])[None, :]
+
+    # 全ランク分のポイントを (商品数 × ランク数) の配列で一度に計算（小数点以下切り捨て）
+    points = np.trunc(price[:, None] / tax * rates).astype(int)
+    sale_points = np.trunc(sale_price[:, None] / tax * rates).astype(int)
+
+    columns = {'品番3': df00['商品コード'].to_numpy()}
+    for j, (tier, _) in enumerate(MEMBER_TIERS):
+        columns[f'販売価格(税込)[レベル1：{tier}]'] = price
+        columns[f'ポイント数[レベル1：{tier}]'] = points[:, j]
+        columns[f'セール開始日[レベル1：{tier}]'] = start_date
+        columns[f'セール終了日[レベル1：{tier}]'] = SALE_END_DATE
+        columns[f'セール価格(税込)[レベル1：{tier}]'] = sale_price
+        columns[f'セールポイント数[レベル1：{tier}]'] = sale_points[:, j]
+    return pd.DataFrame(columns)
+
+
+def price_table(df00):
+    """価格調査結果から、各モール共通で使う列だけの表を作る"""
+    # 途中までファイルを書き出してから失敗しないよう、先に確認する
+    if df00['変更価格'].isna().any():
+        raise ValueError('変更価格が入力されていない商品があります')
+    return df00[PRICE_TABLE_COLUMNS].reset_index(drop=True)
+
+
+def iter_update_files(df00, now=None):
+    """各モールの価格更新用データを1ファイルずつ作成する（ファイル名, データ）
+
+    共通の表を一度だけ作り、次のファイルを作る前に前のデータを手放せるよう順に返す。
+    """
+    table = price_table(df00)
+    yield RAKUTEN_FILE, build_rakuten(table)
+    yield YAHOO_FILE, build_yahoo(table)
+    yield TONYA_FILE, build_tonya(table, now)
+
+
+def build_update_files(df00, now=None):
+    """価格調査結果から各モールの価格更新用データを作成する（ファイル名: データ）"""
+    return dict(iter_update_files(df00, now))
+
+
+def write_csv(df, f, encoding=UPLOAD_ENCODING):
+    # バイナリのファイルに文字コードを変換しながら書き出す
+    with io.TextIOWrapper(f, encoding=encoding, newline='') as text:
+        df.to_csv(text, index=False)
+
+
+def write_bundle(f, df00, now=None):
+    """各モールの価格更新ファイル（Shift_JIS）を1ファイルずつZIPに書き出す"""
+    with zipfile.ZipFile(f, 'w', compression=zipfile.ZIP_DEFLATED) as bundle:
+        for file_name, df in iter_update_files(df00, now):
+            with bundle.open(file_name, 'w') as member:
+                write_csv(df, member)
+
+
+def bundle_bytes(df00, now=None):
+    # ダウンロード用のZIP
+    buffer = io.BytesIO()
+    write_bundle(buffer, df00, now)
+    return buffer.getvalue()
+
+
+def csv_bytes(df):
+    # ダウンロード・ファイル出力用のCSV（BOM付きUTF-8）
+    return df.to_csv(index=False).encode('utf-8-sig')
@@ -0,0 +1,119 @@
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+from pricecheck.cache import DEFAULT_PATH as CACHE_PATH
+
+DEFAULT_PATH = os.path.join(os.path.dirname(CACHE_PATH), 'history.sqlite3')
+
+# 変更があったかを判定する列
+COMPARE_COLUMNS = ['最安値', 'ショップ', '推奨価格']
+
+
+class PriceHistory:
+    """csv検索で取得した最安値の履歴（商品コード・JANコード・取得日時ごと）"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30)
+        with self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS observations ('
+                'product_code TEXT NOT NULL, jan TEXT, run_id TEXT NOT NULL, observed_at REAL NOT NULL, '
+                'price INTEGER, shop TEXT, recommended INTEGER, margin_rate REAL, '
+                'PRIMARY KEY (product_code, run_id))'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS observations_latest ON observations (product_code, observed_at)')
+
+    def record(self, run_id, df_result, observed_at=None, searched=None):
+        """build_results の結果を記録する（同じ実行の再表示では上書き）
+
+        searched（検索した商品マスタの行）を渡すと、検索して見つからなかった商品も最安値なし（NULL）で記録する。
+        """
+        observed_at = observed_at or time.time()
+        codes = df_result['商品コード'].astype(str).tolist()
+        records = zip(
+            codes,
+            df_result['JANコード'].astype(str).tolist(),
+            df_result['最安値'].astype(int).tolist(),
+            df_result['ショップ'].tolist(),
+            df_result['推奨価格'].astype(int).tolist(),
+            df_result['最安時粗利率'].astype(float).tolist(),
+        )
+        rows = [(code, jan, run_id, observed_at, price, shop, recommended, margin) for code, jan, price, shop, recommended, margin in records]
+        if searched is not None:
+            missing = searched[~searched['商品コード'].astype(str).isin(codes)].drop_duplicates('商品コード')
+            rows += [
+                (code, jan, run_id, observed_at, None, None, None, None)
+                for code, jan in zip(missing['商品コード'].astype(str).tolist(), missing['JANコード'].astype(str).tolist())
+            ]
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO observations (product_code, jan, run_id, observed_at, price, shop, recommended, margin_rate) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                rows,
+            )
+
+    def latest(self, exclude_run_id=None):
+        """商品コードごとの直近の記録（exclude_run_id の実行分は除く）"""
+        return pd.read_sql_query(
+            'SELECT product_code AS 商品コード, price AS 最安値, shop AS ショップ, recommended AS 推奨価格, observed_at '
+            'FROM observations o WHERE run_id != ? AND observed_at = ('
+            'SELECT MAX(observed_at) FROM observations WHERE product_code = o.product_code AND run_id != ?)',
+            self._conn,
+            params=(exclude_run_id or '', exclude_run_id or ''),
+        )
+
+    def runs(self):
+        """記録した実行の一覧（新しい順、実行ID・取得日時・最安値を取得できた商品数）"""
+        return pd.read_sql_query(
+            'SELECT run_id, MAX(observed_at) AS observed_at, COUNT(price) AS items FROM observations '
+            'GROUP BY run_id ORDER BY observed_at DESC',
+            self._conn,
+        )
+
+    def run_results(self, run_id):
+        """記録した実行の結果（価格調査結果CSVと同じ列名、見つからなかった商品は除く）"""
+        return pd.read_sql_query(
+            'SELECT product_code AS 商品コード, shop AS ショップ, price AS 最安値, margin_rate AS 最安時粗利率, recommended AS 推奨価格 '
+            'FROM observations WHERE run_id = ? AND price IS NOT NULL',
+            self._conn,
+            params=(run_id,),
+        )
+
+    def changed(self, df_result, run_id):
+        """前回の実行から 最安値・ショップ・推奨価格 のいずれかが変わった行（初回の商品を含む）"""
+        previous = self.latest(exclude_run_id=run_id).drop_duplicates('商品コード').set_index('商品コード')
+        codes = df_result['商品コード'].astype(str)
+        mask = ~codes.isin(previous.index)
+        for column in COMPARE_COLUMNS:
+            before = codes.map(previous[column])
+            mask |= df_result[column].to_numpy() != before.to_numpy()
+        return mask.to_numpy()
+
+    def stats(self, exclude_run_id=None):
+        """商品コードごとの確認回数・価格変動回数・直近の粗利率・最終確認日時（exclude_run_id の実行分は除く）
+
+        見つからなかった記録も確認回数・最終確認日時に数える（粗利率は NaN）。
+        """
+        df = pd.read_sql_query(
+            'SELECT product_code, observed_at, price, margin_rate FROM observations WHERE run_id != ? '
+            'ORDER BY product_code, observed_at',
+            self._conn,
+            params=(exclude_run_id or '',),
+        )
+        grouped = df.groupby('product_code')
+        # 同じ商品の1つ前の記録から最安値が変わった回数（見つからなくなった・見つかるようになったのも変化）
+        previous = grouped['price'].shift()
+        same = (df['price'] == previous) | (df['price'].isna() & previous.isna())
+        moved = (grouped.cumcount() > 0) & ~same
+        return pd.DataFrame({
+            'checks': grouped.size(),
+            'changes': moved.groupby(df['product_code']).sum(),
+            'margin_rate': grouped['margin_rate'].last(),
+            'last_observed': grouped['observed_at'].max(),
+        })
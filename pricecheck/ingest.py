@@ -0,0 +1,58 @@
+import pandas as pd
+
+MASTER_COLUMNS = ['商品コード', '商品名', 'JANコード', '通販単価', '仕入単価', '税率区分名', '商品分類6名']
+
+# 読み込む列の型（コード類は文字列のまま、区分名はカテゴリ型）
+MASTER_DTYPES = {
+    '商品コード': 'str',
+    '商品名': 'str',
+    'JANコード': 'str',
+    '通販単価': 'float64',
+    '仕入単価': 'float64',
+    '税率区分名': 'category',
+    '商品分類6名': 'category',
+}
+CATEGORY_COLUMNS = ['税率区分名', '商品分類6名']
+
+# csv1 を一度に読み込む行数
+CHUNK_SIZE = 50000
+
+
+def header(file, encoding):
+    # ヘッダー行だけを読む（アップロードされたファイルは先頭に戻す）
+    columns = pd.read_csv(file, encoding=encoding, nrows=0).columns
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    return list(columns)
+
+
+def read_master(master_file, goods_file=None, chunk_size=CHUNK_SIZE):
+    """商品マスタ（csv1）を読み込む。goods（csv2）があれば販売中の商品に絞る
+
+    必要な列だけを型を指定して読み込み、csv1 は chunk_size 行ずつ goods の商品コードの索引と突き合わせる。
+    """
+    master_columns = [c for c in MASTER_COLUMNS if c in header(master_file, 'utf-8')]
+    if goods_file is None:
+        return pd.read_csv(
+            master_file, encoding='utf-8', usecols=master_columns,
+            dtype={c: MASTER_DTYPES[c] for c in master_columns},
+        )[master_columns]
+
+    # goods からは商品コード（と csv1 にない列）だけを読み込む
+    goods_columns = [c for c in header(goods_file, 'cp932') if c == '商品コード' or (c in MASTER_COLUMNS and c not in master_columns)]
+    df2 = pd.read_csv(goods_file, encoding='cp932', usecols=goods_columns, dtype={c: MASTER_DTYPES[c] for c in goods_columns})
+    goods = df2.set_index('商品コード')
+
+    frames = []
+    chunks = pd.read_csv(
+        master_file, encoding='utf-8', usecols=master_columns,
+        dtype={c: MASTER_DTYPES[c] for c in master_columns}, chunksize=chunk_size,
+    )
+    for chunk in chunks:
+        frames.append(chunk.join(goods, on='商品コード', how='inner'))
+    df_merged = pd.concat(frames, ignore_index=True)
+
+    # チャンクごとにカテゴリが異なるため、結合後にまとめ直す
+    for column in CATEGORY_COLUMNS:
+        df_merged[column] = df_merged[column].astype('category')
+    return df_merged[MASTER_COLUMNS]
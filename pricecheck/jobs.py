@@ -0,0 +1,201 @@
+import io
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from pricecheck.export import csv_bytes
+from pricecheck.history import PriceHistory
+from pricecheck.ingest import read_master
+from pricecheck.journal import RunJournal, run_id_for
+from pricecheck.lookup import DEFAULT_WORKERS, lookup_master, to_columns
+from pricecheck.metrics import RunMetrics
+from pricecheck.results import build_results, select_rows, split_results
+from pricecheck.schedule import plan_refresh
+
+# ジョブの状態
+QUEUED = '待機中'
+RUNNING = '実行中'
+DONE = '完了'
+FAILED = '失敗'
+
+# 同時に実行するジョブ数と、保持する終了済みのジョブ数
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_MAX_JOBS = 20
+
+# 実行中に取得済みの結果を表示する列
+LIVE_COLUMNS = ['商品コード', 'ショップ', '商品名', '最安値', '通販単価', '価格差', '最安時粗利率', '推奨価格']
+
+
+class Job:
+    """バックグラウンドで実行する csv検索 1件（ID・状態・進捗・結果）"""
+
+    def __init__(self, job_id, label, interval=2.0):
+        self.id = job_id
+        self.label = label
+        self.status = QUEUED
+        self.created = time.time()
+        self.started = None
+        self.total = 0
+        self.count = 0
+        self.result = None
+        self.error = None
+        self.metrics = RunMetrics()
+        self.interval = interval
+        self.refreshed = 0
+        self.pending = []
+        self.frames = []
+        self._lock = threading.Lock()
+
+    def start(self, total):
+        self.total = total
+        self.started = time.monotonic()
+
+    def __call__(self, row, item, error):
+        # lookup_master の on_result として1件ごとに呼ばれ、一定間隔で取得済みの分を価格計算しておく
+        self.count += 1
+        self.pending.append((row, item, error))
+        if self.count == self.total or time.monotonic() - self.refreshed >= self.interval:
+            columns, _ = to_columns(self.pending)
+            self.pending = []
+            if len(columns['商品コード']) > 0:
+                frame = build_results(columns)[LIVE_COLUMNS]
+                with self._lock:
+                    self.frames.append(frame)
+            self.refreshed = time.monotonic()
+
+    def speed(self):
+        elapsed = time.monotonic() - self.started if self.started is not None else 0
+        return self.count / elapsed if elapsed > 0 else 0
+
+    def eta(self):
+        speed = self.speed()
+        return (self.total - self.count) / speed if speed > 0 else 0
+
+    def partial(self):
+        """取得済みの結果（実行中の表示用）"""
+        with self._lock:
+            frames = list(self.frames)
+        if len(frames) == 0:
+            return None
+        return pd.concat(frames, ignore_index=True)
+
+
+class JobQueue:
+    """csv検索 を待ち行列に入れ、スクリプトの再実行・タブを閉じても止まらないワーカースレッドで実行する"""
+
+    def __init__(self, max_workers=DEFAULT_JOB_WORKERS, max_jobs=DEFAULT_MAX_JOBS):
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='csv-search')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, label, fn, *args, **kwargs):
+        """fn(job, *args, **kwargs) をジョブとして登録し、Job を返す（戻り値がジョブの結果になる）"""
+        job = Job(uuid.uuid4().hex[:8], label)
+        with self._lock:
+            self._jobs[job.id] = job
+            # 終了済みの古いジョブから削除する
+            finished = [j.id for j in self._jobs.values() if j.status in (DONE, FAILED)]
+            for job_id in finished[:max(len(self._jobs) - self.max_jobs, 0)]:
+                del self._jobs[job_id]
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = RUNNING
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        # 新しい順
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+
+def csv_search(job, master_bytes, goods_bytes, ng_keyword, app_id, cache=None, refresh=False, budget=0, max_workers=DEFAULT_WORKERS, limiter=None, batch_size=1):
+    """アップロードされた csv1（と csv2）の各商品の最安値を検索し、表示・ダウンロード用の結果を返す
+
+    戻り値は notes（メッセージ）・failed（取得に失敗した行）・df_view（表示用）・csv（価格調査結果）・goods（csv2 の有無）と、
+    changed（前回から変更があった行）・changed_csv（変更があった商品のみの価格調査結果）の辞書。
+    """
+    metrics = job.metrics
+    notes = []
+
+    # 途中結果の記録（同じアップロード・条件での再実行は続きから検索。最後まで検索できた実行は最初から検索し直す）
+    journal = RunJournal(run_id_for(master_bytes, goods_bytes, ng_keyword))
+    if refresh or journal.finished():
+        journal.reset()
+    resumed = len(journal.completed())
+    if resumed > 0:
+        notes.append(f'前回の途中結果 {resumed} 件を再利用しました')
+
+    # csv1のみ：リスト内商品すべて / csv1&2：販売中のみ
+    with metrics.stage('ingest'):
+        df = read_master(io.BytesIO(master_bytes), io.BytesIO(goods_bytes) if len(goods_bytes) > 0 else None)
+
+    # 上限があれば、過去の最安値の履歴から優先度の高い商品のみ検索する（この実行の記録は除いて計画する）
+    history = PriceHistory()
+    if budget > 0:
+        total = len(df)
+        df = plan_refresh(df, history.stats(exclude_run_id=journal.run_key()), budget)
+        notes.append(f'優先度の高い {len(df)} / {total} 件を検索しました')
+
+    # 各行の最安値を並列に検索（進捗はジョブに記録し、最後にマスタの行順でまとめる）
+    job.start(len(df))
+    with metrics.stage('fetch'):
+        item_columns, failed = lookup_master(df, ng_keyword, app_id, max_workers=max_workers, cache=cache, refresh=refresh, journal=journal, on_result=job, metrics=metrics, limiter=limiter, batch_size=batch_size)
+    # 取得に失敗した行があれば完了にせず、再実行では失敗した行のみ検索する
+    if len(failed) == 0:
+        journal.finish()
+    summary = metrics.summary()
+    if summary['batch_jans'] > 0:
+        notes.append(f"まとめて検索したJANコードの振り分け率: {summary['batch_match_rate']:.1%}（{summary['batch_jans']} 件・振り分けられなかったものは1件ずつ検索）")
+
+    # ポイント・粗利・推奨価格を計算し、表示用とCSV用に分ける
+    with metrics.stage('price'):
+        df_result = build_results(item_columns)
+
+        # 最安値の履歴を記録し、前回から 最安値・ショップ・推奨価格 が変わった商品を調べる
+        run_key = journal.run_key()
+        changed = history.changed(df_result, run_key)
+        # 検索して見つからなかった商品も記録する（取得に失敗した行は除く）
+        failed_codes = [str(row['商品コード']) for row in failed]
+        history.record(run_key, df_result, searched=df[~df['商品コード'].astype(str).isin(failed_codes)])
+
+        # 変更があった商品のみの出力は表示時に選べるよう、両方作っておく
+        df_view, df_csv = split_results(df_result)
+        _, df_changed_csv = split_results(select_rows(df_result, changed))
+
+    with metrics.stage('export'):
+        csv = csv_bytes(df_csv)
+        changed_csv = csv_bytes(df_changed_csv)
+
+    return {
+        'notes': notes, 'failed': failed, 'df_view': df_view, 'csv': csv, 'goods': len(goods_bytes) > 0,
+        'changed': changed, 'changed_csv': changed_csv,
+    }
+
+
+_shared_queue = None
+_shared_lock = threading.Lock()
+
+
+def shared_queue():
+    # サーバー内のすべてのセッションで1つの待ち行列を共有する（別のセッションから再接続できる）
+    global _shared_queue
+    with _shared_lock:
+        if _shared_queue is None:
+            _shared_queue = JobQueue()
+        return _shared_queue
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from pricecheck.cache import DEFAULT_PATH as CACHE_PATH
+
+DEFAULT_PATH = os.path.join(os.path.dirname(CACHE_PATH), 'runs.sqlite3')
+DEFAULT_MAX_AGE = 24 * 60 * 60
+
+
+def run_id_for(*parts):
+    # アップロード内容と検索条件から実行IDを作る（同じ内容なら同じID）
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        digest.update(part)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class RunJournal:
+    """csv検索の途中結果を商品コードごとに記録し、再実行時に再利用する
+
+    最後まで検索できた実行は finish() で完了として記録する。完了した実行は再利用せず、reset() してから検索し直す。
+    """
+
+    def __init__(self, run_id, path=DEFAULT_PATH, max_age=DEFAULT_MAX_AGE):
+        self.run_id = run_id
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'run_id TEXT NOT NULL, product_code TEXT NOT NULL, item TEXT, recorded_at REAL NOT NULL, '
+                'PRIMARY KEY (run_id, product_code))'
+            )
+            self._conn.execute('CREATE TABLE IF NOT EXISTS finished (run_id TEXT PRIMARY KEY, finished_at REAL NOT NULL)')
+            # 古い実行の記録は削除
+            self._conn.execute('DELETE FROM entries WHERE recorded_at < ?', (time.time() - max_age,))
+            self._conn.execute('DELETE FROM finished WHERE finished_at < ?', (time.time() - max_age,))
+
+    def completed(self):
+        """記録済みの {商品コード: 結果} を返す（結果なしの行は None）"""
+        with self._lock:
+            rows = self._conn.execute('SELECT product_code, item FROM entries WHERE run_id = ?', (self.run_id,)).fetchall()
+        return {code: (json.loads(item) if item is not None else None) for code, item in rows}
+
+    def record(self, product_code, item):
+        body = json.dumps(item, ensure_ascii=False) if item is not None else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries (run_id, product_code, item, recorded_at) VALUES (?, ?, ?, ?)',
+                (self.run_id, str(product_code), body, time.time()),
+            )
+
+    def run_key(self):
+        """この実行を識別するキー（同じアップロードでも、記録をやり直すと別の実行になる）"""
+        with self._lock:
+            started = self._conn.execute('SELECT MIN(recorded_at) FROM entries WHERE run_id = ?', (self.run_id,)).fetchone()[0]
+        return f'{self.run_id}:{started or time.time()}'
+
+    def finished(self):
+        """この実行が最後まで検索できたか"""
+        with self._lock:
+            row = self._conn.execute('SELECT 1 FROM finished WHERE run_id = ?', (self.run_id,)).fetchone()
+        return row is not None
+
+    def finish(self):
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO finished (run_id, finished_at) VALUES (?, ?)', (self.run_id, time.time()))
+
+    def reset(self):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM entries WHERE run_id = ?', (self.run_id,))
+            self._conn.execute('DELETE FROM finished WHERE run_id = ?', (self.run_id,))
@@ -0,0 +1,351 @@
+import heapq
+import math
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from pricecheck.client import IchibaAPIError, shared_client
+from pricecheck.ratelimit import TokenBucket
+
+# 楽天市場APIの上限（アプリIDごとに1秒1リクエスト）
+DEFAULT_RATE = 1.0
+DEFAULT_WORKERS = 4
+
+# まとめて検索する場合の1回のJANコード数と、1回あたりに取得する最大ページ数
+DEFAULT_BATCH_SIZE = 5
+BATCH_MAX_PAGES = 3
+
+# 検索キーワードの最大文字数（APIの上限）と、13桁のJANコードを空白区切りでまとめられる数
+KEYWORD_MAX_LENGTH = 128
+BATCH_MAX_SIZE = (KEYWORD_MAX_LENGTH + 1) // (13 + 1)
+
+# 1ページの最大件数と、取得できる最大ページ数（APIの上限）
+PAGE_HITS = 30
+DEEP_MAX_PAGES = 100
+
+OWN_SHOP = 'FRESH ROASTER珈琲問屋 楽天市場店'
+ITEM_KEY = ['shopName', 'itemCode', 'itemName', 'itemPrice', 'pointRate', 'postageFlag', 'itemUrl', 'reviewCount', 'reviewAverage', 'endTime', 'mediumImageUrls']
+MASTER_KEY = ['商品コード', 'JANコード', '仕入単価', '通販単価', '税率区分名', '商品分類6名']
+
+# 必要な項目だけを階層の浅い形式（formatVersion=2）で返してもらう
+RESPONSE_PARAMS = {
+    "formatVersion": 2,
+    "elements": ','.join(['count'] + ITEM_KEY),
+}
+
+
+def build_search_params(row, ng_keyword, app_id):
+    # 入力パラメータ（自社店舗除外のため検索件数を増やす）
+    return {
+        "format": "json",
+        "keyword": row['JANコード'],
+        "NGKeyword": ng_keyword,
+        "minPrice": int(row['仕入単価']),
+        "maxPrice": int(row['通販単価']*1.5),
+        "applicationId": app_id,
+        "availability": 1,
+        "hits": 5,
+        "page": 1,
+        'sort': '+itemPrice',
+        **RESPONSE_PARAMS,
+    }
+
+
+def build_batch_params(plans):
+    """複数のJANコードの検索条件を、orFlag=1 の1つの検索条件にまとめる（価格範囲は最も広く取る）
+
+    JANコードで振り分けるため、商品説明文も返してもらう。
+    """
+    batch_params = {
+        **plans[0],
+        "keyword": ' '.join(str(params['keyword']) for params in plans),
+        "orFlag": 1,
+        "minPrice": min(params['minPrice'] for params in plans),
+        "maxPrice": max(params['maxPrice'] for params in plans),
+        "hits": PAGE_HITS,
+        "elements": RESPONSE_PARAMS['elements'] + ',itemCaption',
+    }
+    return batch_params
+
+
+def batch_plans(plans, batch_size):
+    """検索条件を batch_size 件ずつ、まとめたキーワードが KEYWORD_MAX_LENGTH 文字を超えないように分ける"""
+    batches = []
+    batch = []
+    length = 0
+    for plan in plans:
+        keyword_length = len(str(plan[0]['keyword']))
+        if len(batch) > 0 and (len(batch) >= batch_size or length + 1 + keyword_length > KEYWORD_MAX_LENGTH):
+            batches.append(batch)
+            batch = []
+        length = keyword_length if len(batch) == 0 else length + 1 + keyword_length
+        batch.append(plan)
+    if len(batch) > 0:
+        batches.append(batch)
+    return batches
+
+
+def match_jans(items, jans):
+    """商品名・商品説明文に含まれるJANコードで、検索結果を {JANコード: 商品のリスト} に振り分ける（自社店舗は除く）"""
+    pattern = re.compile(r'(?<!\d)(' + '|'.join(re.escape(jan) for jan in jans) + r')(?!\d)')
+    matched = {}
+    for item in items:
+        if item.get('shopName') == OWN_SHOP:
+            continue
+        for jan in set(pattern.findall(f"{item.get('itemName', '')} {item.get('itemCaption', '')}")):
+            matched.setdefault(jan, []).append(item)
+    return matched
+
+
+def pick_cheapest(result, min_price=None, max_price=None):
+    # APIエラーまたは検索結果なしの場合はNone
+    if 'error' in result or 'Items' not in result or len(result['Items']) == 0:
+        return None
+
+    # 自社店舗を除外して最安値1件のみ取得（価格範囲の指定があれば範囲内のみ）
+    for item in result['Items']:
+        if item.get('shopName') == OWN_SHOP:
+            continue
+        if min_price is not None and item['itemPrice'] < min_price:
+            continue
+        if max_price is not None and item['itemPrice'] > max_price:
+            continue
+        return {key: item[key] for key in ITEM_KEY if key in item}
+    return None
+
+
+def is_complete(result):
+    # 検索条件に合う全件が返っているか（count が取得件数以下）
+    return result.get('count', 0) <= len(result.get('Items', []))
+
+
+def plan_queries(rows, ng_keyword, app_id):
+    """同じJANコードの行をまとめ、価格範囲を最も広く取った検索条件を1つ作る
+
+    戻り値は (検索条件, 行番号のリスト) のリスト。
+    """
+    groups = {}
+    for i, row in enumerate(rows):
+        groups.setdefault(str(row['JANコード']), []).append(i)
+
+    plans = []
+    for indices in groups.values():
+        search_params = build_search_params(rows[indices[0]], ng_keyword, app_id)
+        for i in indices[1:]:
+            row_params = build_search_params(rows[i], ng_keyword, app_id)
+            search_params['minPrice'] = min(search_params['minPrice'], row_params['minPrice'])
+            search_params['maxPrice'] = max(search_params['maxPrice'], row_params['maxPrice'])
+        plans.append((search_params, indices))
+    return plans
+
+
+def search(search_params, limiter=None, cache=None, refresh=False, client=None, metrics=None):
+    """検索APIを呼び出す（キャッシュにあればAPIを呼ばずに返す）"""
+    if cache is not None and not refresh:
+        started = time.perf_counter()
+        result = cache.get(search_params)
+        if result is not None:
+            if metrics is not None:
+                metrics.record_call(search_params.get('keyword'), time.perf_counter() - started, cache_hit=True)
+            return result
+
+    result = (client or shared_client()).get(search_params, limiter, metrics)
+
+    # エラー応答はキャッシュしない
+    if cache is not None and 'error' not in result:
+        cache.put(search_params, result)
+    return result
+
+
+def deep_search(search_params, top_n, rate=DEFAULT_RATE, max_workers=DEFAULT_WORKERS, cache=None, refresh=False, client=None, metrics=None, limiter=None):
+    """価格の安い順の検索結果を複数ページ並列に取得し、自社店舗を除いた上位 top_n 件を返す
+
+    ページは価格順に並んでいるため、先頭から続けて取得したページで top_n 件そろった時点で、
+    残りのページ（それ以上の価格）は取得しない。戻り値は search と同じ形式。
+    limiter を渡すと rate の代わりにそれで呼び出しを制限する（QuotaGovernor など）。
+    """
+    limiter = limiter or TokenBucket(rate)
+    page_params = {**search_params, 'hits': PAGE_HITS, 'sort': '+itemPrice'}
+
+    def fetch(page):
+        return search({**page_params, 'page': page}, limiter, cache, refresh, client, metrics)
+
+    # 1ページ目で全件数を確認する
+    first = fetch(1)
+    if 'error' in first:
+        return first
+    pages = [first.get('Items', [])]
+    last_page = min(DEEP_MAX_PAGES, math.ceil(first.get('count', 0) / PAGE_HITS))
+
+    def accepted():
+        return sum(1 for items in pages for item in items if item.get('shopName') != OWN_SHOP)
+
+    # 足りない件数分のページだけを同時接続数ずつ取得する
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while len(pages) < last_page and accepted() < top_n:
+            needed = math.ceil((top_n - accepted()) / PAGE_HITS)
+            batch = range(len(pages) + 1, min(len(pages) + min(needed, max_workers), last_page) + 1)
+            results = list(executor.map(fetch, batch))
+            for result in results:
+                # 範囲外のページ（件数が途中で減った場合など）で打ち切る
+                if 'error' in result or len(result.get('Items', [])) == 0:
+                    last_page = len(pages)
+                    break
+                pages.append(result['Items'])
+
+    # ページ間で順序が前後する場合があるため価格でマージし、重複した商品は除く
+    items = []
+    seen = set()
+    for item in heapq.merge(*pages, key=lambda item: item['itemPrice']):
+        code = item.get('itemCode')
+        if item.get('shopName') == OWN_SHOP or (code is not None and code in seen):
+            continue
+        seen.add(code)
+        items.append(item)
+        if len(items) == top_n:
+            break
+    return {'count': first.get('count', 0), 'Items': items}
+
+
+def iter_lookup(rows, ng_keyword, app_id, rate=DEFAULT_RATE, max_workers=DEFAULT_WORKERS, cache=None, refresh=False, journal=None, client=None, metrics=None, limiter=None, batch_size=1):
+    """商品マスタの各行の最安値を並列に検索し、取得できた順に (行番号, 結果, エラー) を返す
+
+    同じJANコードの行は1回の検索にまとめ、行ごとの価格範囲で絞り込む。
+    journal を渡すと1件ごとに結果を記録し、記録済みの商品コードは検索しない。
+    limiter を渡すと rate の代わりにそれで呼び出しを制限する（QuotaGovernor など）。
+    batch_size が2以上なら、その数のJANコードを orFlag=1 で1回にまとめて検索し、結果を商品名・商品説明文の
+    JANコードで振り分ける。振り分けられなかったJANコードは1件ずつ検索し直す。
+    """
+    limiter = limiter or TokenBucket(rate)
+    done = journal.completed() if journal is not None else {}
+
+    # 記録済みの行は検索せず、未取得の行（とマスタ上の行番号）だけを残す
+    pending = []
+    pending_index = []
+    for i, row in enumerate(rows):
+        code = str(row['商品コード'])
+        if code in done:
+            yield i, done[code], None
+        else:
+            pending.append(row)
+            pending_index.append(i)
+
+    def fetch(search_params):
+        try:
+            result = search(search_params, limiter, cache, refresh, client, metrics)
+        except IchibaAPIError as e:
+            return None, str(e)
+        if 'error' in result:
+            return None, result.get('error_description', result['error'])
+        return result, None
+
+    def lookup(plan):
+        search_params, indices = plan
+        result, error = fetch(search_params)
+        outcomes = []
+        for i in indices:
+            row = pending[i]
+            if error is not None:
+                outcomes.append((pending_index[i], None, error))
+                continue
+            row_params = build_search_params(row, ng_keyword, app_id)
+            item = pick_cheapest(result, row_params['minPrice'], row_params['maxPrice'])
+            # まとめた検索で上位に入らなかった場合は、その行の条件で検索し直す
+            if item is None and row_params != search_params and not is_complete(result):
+                row_result, row_error = fetch(row_params)
+                if row_error is not None:
+                    outcomes.append((pending_index[i], None, row_error))
+                    continue
+                item = pick_cheapest(row_result)
+            # 失敗した行は記録せず、再実行時に検索し直す
+            if journal is not None:
+                journal.record(row['商品コード'], item)
+            outcomes.append((pending_index[i], item, None))
+        return outcomes
+
+    def fetch_batch(batch):
+        # 価格の安い順に、全JANコードが見つかるか最後のページまで取得する
+        batch_params = build_batch_params([search_params for search_params, _ in batch])
+        jans = [str(search_params['keyword']) for search_params, _ in batch]
+        items = []
+        for page in range(1, BATCH_MAX_PAGES + 1):
+            result, error = fetch({**batch_params, 'page': page})
+            if error is not None:
+                break
+            items.extend(result.get('Items', []))
+            if len(match_jans(items, jans)) == len(jans) or page * PAGE_HITS >= result.get('count', 0):
+                break
+        return match_jans(items, jans)
+
+    def lookup_batch(batch):
+        matched = fetch_batch(batch)
+        outcomes = []
+        resolved = 0
+        for plan in batch:
+            search_params, indices = plan
+            items = matched.get(str(search_params['keyword']))
+            picked = []
+            if items is not None:
+                for i in indices:
+                    row_params = build_search_params(pending[i], ng_keyword, app_id)
+                    picked.append(pick_cheapest({'Items': items}, row_params['minPrice'], row_params['maxPrice']))
+            # 振り分けられなかった（または価格範囲内の商品がない行がある）JANコードは1件ずつ検索する
+            if items is None or any(item is None for item in picked):
+                outcomes.extend(lookup(plan))
+                continue
+            resolved += 1
+            for i, item in zip(indices, picked):
+                if journal is not None:
+                    journal.record(pending[i]['商品コード'], item)
+                outcomes.append((pending_index[i], item, None))
+        if metrics is not None:
+            metrics.record_match(resolved, len(batch))
+        return outcomes
+
+    plans = plan_queries(pending, ng_keyword, app_id)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        if batch_size > 1:
+            futures = [executor.submit(lookup_batch, batch) for batch in batch_plans(plans, batch_size)]
+        else:
+            futures = [executor.submit(lookup, plan) for plan in plans]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def to_columns(outcomes):
+    """(マスタの行, 結果, エラー) から、列ごとのリストと失敗した行のリストを作る"""
+    columns = {key: [] for key in ITEM_KEY + MASTER_KEY}
+    failed = []
+    for row, item, error in outcomes:
+        if error is not None:
+            failed.append({'商品コード': row['商品コード'], 'JANコード': row['JANコード'], 'エラー': error})
+            continue
+        if item is None:
+            continue
+        for key in ITEM_KEY:
+            columns[key].append(item.get(key))
+        columns['商品コード'].append(row['商品コード'])
+        columns['JANコード'].append(row['JANコード'])
+        columns['仕入単価'].append(int(row['仕入単価']))
+        columns['通販単価'].append(int(row['通販単価']))
+        columns['税率区分名'].append(row['税率区分名'])
+        columns['商品分類6名'].append(row['商品分類6名'])
+    return columns, failed
+
+
+def lookup_master(df, ng_keyword, app_id, rate=DEFAULT_RATE, max_workers=DEFAULT_WORKERS, cache=None, refresh=False, journal=None, client=None, on_result=None, metrics=None, limiter=None, batch_size=1):
+    """商品マスタの各行の最安値を検索し、マスタの行順で返す
+
+    on_result を渡すと、1件取得するごとに (行, 結果, エラー) で呼び出す。
+    metrics を渡すと、API呼び出し（キャッシュヒットを含む）ごとに記録する。
+    戻り値は (列名: 値のリスト の辞書, 取得に失敗した行のリスト)。
+    """
+    rows = df.to_dict('records')
+    results = [(None, None)] * len(rows)
+    for i, item, error in iter_lookup(rows, ng_keyword, app_id, rate, max_workers, cache, refresh, journal, client, metrics, limiter, batch_size):
+        results[i] = (item, error)
+        if on_result is not None:
+            on_result(rows[i], item, error)
+
+    # マスタの行順で、列ごとのリストに結果を詰める
+    return to_columns((row, item, error) for row, (item, error) in zip(rows, results))
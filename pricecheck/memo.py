@@ -0,0 +1,29 @@
+from collections import OrderedDict
+
+import streamlit as st
+
+DEFAULT_MAX_ENTRIES = 4
+
+
+class SessionMemo:
+    """計算結果をセッション内に保持し、同じキーの再実行（ダウンロード・表示の切り替え）では再計算しない
+
+    キーはアップロード内容のハッシュと検索条件から作る。新しく使った順に max_entries 件まで保持する。
+    """
+
+    def __init__(self, name, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.store = st.session_state.setdefault(f'memo_{name}', OrderedDict())
+
+    def get(self, key):
+        if key not in self.store:
+            return None
+        self.store.move_to_end(key)
+        return self.store[key]
+
+    def put(self, key, value):
+        self.store[key] = value
+        self.store.move_to_end(key)
+        while len(self.store) > self.max_entries:
+            self.store.popitem(last=False)
+        return value
@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+
+class RunMetrics:
+    """1回の実行の処理段階ごとの時間と、API呼び出しごとの記録"""
+
+    def __init__(self):
+        self.stages = []
+        self.calls = []
+        # まとめて検索したJANコードの数と、そのうち結果を振り分けられた数
+        self.batch_jans = 0
+        self.batch_resolved = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        # with metrics.stage('fetch'): の範囲の経過時間を記録する
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(name, time.perf_counter() - started)
+
+    def record_stage(self, name, seconds):
+        self.stages.append({'stage': name, 'seconds': seconds})
+
+    def record_call(self, keyword, latency, status=None, retries=0, cache_hit=False):
+        with self._lock:
+            self.calls.append({
+                'keyword': str(keyword),
+                'latency_ms': latency * 1000,
+                'status': status,
+                'retries': retries,
+                'cache_hit': cache_hit,
+            })
+
+    def record_match(self, resolved, total):
+        with self._lock:
+            self.batch_jans += total
+            self.batch_resolved += resolved
+
+    def merge(self, other):
+        # 別の実行（バックグラウンドのジョブなど）の記録をまとめて表示する
+        with self._lock:
+            self.stages.extend(other.stages)
+            self.calls.extend(other.calls)
+            self.batch_jans += other.batch_jans
+            self.batch_resolved += other.batch_resolved
+
+    def stage_seconds(self):
+        # 同じ段階が複数回あれば合計する
+        totals = {}
+        for record in self.stages:
+            totals[record['stage']] = totals.get(record['stage'], 0) + record['seconds']
+        return totals
+
+    def summary(self):
+        # numpy は起動時に読み込まないよう、集計するときに読み込む
+        import numpy as np
+
+        with self._lock:
+            calls = list(self.calls)
+        api_calls = [c for c in calls if not c['cache_hit']]
+        latencies = np.array([c['latency_ms'] for c in api_calls]) if api_calls else np.zeros(1)
+        return {
+            'stages_sec': self.stage_seconds(),
+            'lookups': len(calls),
+            'cache_hits': len(calls) - len(api_calls),
+            'api_calls': len(api_calls),
+            'retries': sum(c['retries'] for c in api_calls),
+            'errors': sum(1 for c in api_calls if c['status'] != 200),
+            'latency_p50_ms': float(np.percentile(latencies, 50)),
+            'latency_p95_ms': float(np.percentile(latencies, 95)),
+            'batch_jans': self.batch_jans,
+            'batch_match_rate': self.batch_resolved / self.batch_jans if self.batch_jans > 0 else None,
+        }
+
+    def calls_frame(self):
+        import pandas as pd
+
+        with self._lock:
+            return pd.DataFrame(self.calls, columns=['keyword', 'latency_ms', 'status', 'retries', 'cache_hit'])
+
+    def to_json(self):
+        with self._lock:
+            calls = list(self.calls)
+        return json.dumps({'summary': self.summary(), 'stages': self.stages, 'calls': calls}, ensure_ascii=False, indent=2)
@@ -0,0 +1,22 @@
+import streamlit as st
+
+# どの機能でも毎回読み込むため、streamlit 以外（pandas・検索や出力の処理）は読み込まない
+
+
+def show_metrics(metrics):
+    """処理段階ごとの時間とAPI呼び出しの集計をサイドバーに表示する"""
+    summary = metrics.summary()
+    if len(summary['stages_sec']) == 0:
+        return
+
+    with st.sidebar.expander('処理時間・API計測'):
+        st.dataframe({'段階': list(summary['stages_sec']), '秒': list(summary['stages_sec'].values())}, hide_index=True)
+        st.text(
+            f"検索 {summary['lookups']} 件（キャッシュ {summary['cache_hits']} / API {summary['api_calls']}）\n"
+            f"リトライ {summary['retries']} 回・エラー {summary['errors']} 件\n"
+            f"応答時間 p50 {summary['latency_p50_ms']:.0f}ms / p95 {summary['latency_p95_ms']:.0f}ms"
+        )
+        if summary['batch_jans'] > 0:
+            st.text(f"まとめて検索 {summary['batch_jans']} 件・振り分け率 {summary['batch_match_rate']:.1%}")
+        st.download_button('計測結果（JSON）', metrics.to_json(), file_name='計測結果.json', mime='application/json')
+        st.download_button('API呼び出し一覧（CSV）', metrics.calls_frame().to_csv(index=False).encode('utf-8-sig'), file_name='API呼び出し一覧.csv', mime='text/csv')
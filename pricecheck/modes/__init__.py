@@ -0,0 +1,14 @@
+import importlib
+
+# 検索機能ごとの画面のモジュール（選ばれた機能のモジュールだけを初回に読み込む）
+MODES = {
+    '個別検索': 'pricecheck.modes.single',
+    'csv検索': 'pricecheck.modes.csv_search',
+    '価格更新ファイル作成': 'pricecheck.modes.update_files',
+    '結果比較': 'pricecheck.modes.compare',
+}
+
+
+def load_mode(name):
+    # 2回目以降（再実行）は読み込み済みのモジュールを返す
+    return importlib.import_module(MODES[name])
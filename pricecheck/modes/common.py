@@ -0,0 +1,21 @@
+import streamlit as st
+
+from pricecheck.cache import DEFAULT_TTL, ResponseCache
+from pricecheck.quota import shared_governor
+
+
+def api_settings():
+    """個別検索・csv検索 共通のサイドバー（検索結果のキャッシュとAPI呼び出しの割り当て）
+
+    戻り値は (キャッシュ有効期限（時間）, 再取得するか, ResponseCache, このセッションの QuotaShare)。
+    """
+    # 検索結果のキャッシュ（同じ条件の再検索はAPIを呼ばない）
+    cache_hours = st.sidebar.number_input('キャッシュ有効期限（時間）', min_value=0, value=DEFAULT_TTL // 3600, step=1)
+    refresh_cache = st.sidebar.checkbox('キャッシュを使わず再取得')
+    response_cache = ResponseCache(ttl=cache_hours * 3600)
+
+    # 全セッションのAPI呼び出しを、登録したアプリIDごとの上限内でセッション・ジョブごとに順番に割り当てる
+    governor = shared_governor()
+    st.sidebar.text(f'アプリID {len(governor.app_ids)} 件（全体で {governor.total_rate:g} 回/秒まで）')
+    st.sidebar.markdown("* * * ")
+    return cache_hours, refresh_cache, response_cache, governor.share()
@@ -0,0 +1,80 @@
+"""結果比較：前回と今回の価格調査結果を比較"""
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from pricecheck.diff import REPORT_FILE, compare_results, moved, read_results, summarize
+from pricecheck.export import csv_bytes
+from pricecheck.history import PriceHistory
+from pricecheck.journal import run_id_for
+from pricecheck.memo import SessionMemo
+from pricecheck.view import show_table
+
+
+def render(metrics):
+    """画面を表示する（処理段階ごとの時間は metrics に記録する）"""
+    st.subheader('前回と今回の価格調査結果を比較')
+
+    source = st.sidebar.radio('比較する結果', ['価格調査結果ファイル', '保存した実行'])
+    diff_key = None
+
+    try:
+        if source == '価格調査結果ファイル':
+            uploaded_before = st.sidebar.file_uploader("前回の価格調査結果", type="csv", key="diff_before")
+            uploaded_after = st.sidebar.file_uploader("今回の価格調査結果", type="csv", key="diff_after")
+            if uploaded_before is not None and uploaded_after is not None:
+                diff_key = run_id_for(uploaded_before.getvalue(), uploaded_after.getvalue())
+        else:
+            # csv検索で記録した最安値の履歴から選ぶ
+            history = PriceHistory()
+            runs = history.runs()
+            if len(runs) < 2:
+                st.text('比較できる実行が2件以上ありません（csv検索を実行すると記録されます）')
+            else:
+                labels = {run.run_id: f'{datetime.fromtimestamp(run.observed_at):%Y/%m/%d %H:%M}（{run.items} 件）' for run in runs.itertuples()}
+                before_id = st.sidebar.selectbox('前回', list(labels), index=1, format_func=labels.get)
+                after_id = st.sidebar.selectbox('今回', list(labels), index=0, format_func=labels.get)
+                diff_key = (before_id, after_id)
+
+        if diff_key is not None:
+            # 同じ組み合わせの比較は、表示の切り替えによる再実行では再計算しない
+            diff_memo = SessionMemo('結果比較')
+            outcome = diff_memo.get(diff_key)
+            if outcome is None:
+                with metrics.stage('ingest'):
+                    if source == '価格調査結果ファイル':
+                        df_before = read_results(uploaded_before)
+                        df_after = read_results(uploaded_after)
+                    else:
+                        df_before = history.run_results(before_id)
+                        df_after = history.run_results(after_id)
+
+                # 商品コードで突き合わせて、最安値・ショップ・粗利率の変化を計算
+                with metrics.stage('compare'):
+                    df_diff = compare_results(df_before, df_after)
+                    df_moved = moved(df_diff)
+
+                with metrics.stage('export'):
+                    report = csv_bytes(df_moved)
+
+                outcome = diff_memo.put(diff_key, {'summary': summarize(df_diff), 'df_diff': df_diff, 'df_moved': df_moved, 'report': report})
+
+            st.dataframe(pd.DataFrame([outcome['summary']]), hide_index=True)
+
+            # CSVファイルとしてデータを出力するボタン
+            st.download_button(
+                label="価格変動レポートをダウンロード",
+                data=outcome['report'],
+                file_name=REPORT_FILE,
+                mime='text/csv',
+            )
+
+            # 変化があった商品を変動率の大きい順に表示
+            moved_only = st.sidebar.checkbox('変化があった商品のみ表示', value=True)
+            with metrics.stage('render'):
+                show_table(outcome['df_moved'] if moved_only else outcome['df_diff'], 'diff', {'変動率': "{:.1%}", '最安時粗利率(前回)': "{:.2f}", '最安時粗利率(今回)': "{:.2f}", '粗利率差分': "{:.2f}"})
+
+    except Exception as e:
+        # エラーメッセージを表示
+        st.error(f"価格調査結果の読み込み中にエラーが発生しました: {e}")
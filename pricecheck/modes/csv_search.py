@@ -0,0 +1,163 @@
+"""csv検索：csvファイル内にある各商品の最安値を出力"""
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from pricecheck.client import APP_ID
+from pricecheck.jobs import DONE, FAILED, QUEUED, csv_search, shared_queue
+from pricecheck.journal import run_id_for
+from pricecheck.lookup import BATCH_MAX_SIZE, DEFAULT_WORKERS
+from pricecheck.memo import SessionMemo
+from pricecheck.modes.common import api_settings
+from pricecheck.view import show_table
+
+# 実行中のジョブの進捗を表示し直す間隔（秒）
+JOB_POLL_SECONDS = 2
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def show_job_progress(job):
+    """実行中のジョブの進捗（進捗バー・残り時間・処理速度）と取得済みの結果を一定間隔で表示する
+
+    ジョブが終了したら画面全体を再実行し、最終結果の表示に切り替える。
+    """
+    if job.status in (DONE, FAILED):
+        st.rerun()
+    if job.status == QUEUED or job.started is None:
+        st.text(f'ジョブ {job.id} は順番待ちです')
+        return
+
+    st.progress(
+        job.count / job.total if job.total > 0 else 1.0,
+        text=f'検索中… {job.count} / {job.total} 件（{job.speed():.1f} 件/秒・残り約 {job.eta():.0f} 秒）',
+    )
+    partial = job.partial()
+    if partial is not None:
+        st.dataframe(partial, hide_index=True)
+
+
+def render(metrics):
+    """画面を表示する（完了したジョブを表示した場合は、そのジョブの計測結果も metrics に加える）"""
+    cache_hours, refresh_cache, response_cache, limiter = api_settings()
+
+    st.subheader('csvファイル内にある各商品の最安値を出力')
+    st.text('送料は商品個別で設定されている場合のみ（3,980円以上で送料無料の場合は送料別で取得される）')
+
+    st.sidebar.markdown('csv1: リスト内商品すべて検索<br>csv1&2: 販売中のみ検索<br>csv2: 検索不可', unsafe_allow_html=True)
+    st.sidebar.markdown("* * * ")
+
+    uploaded_file1 = st.sidebar.file_uploader("【csv1】汎用明細T9999：商品マスタ", type="csv", key="csv1")
+    uploaded_file2 = st.sidebar.file_uploader("【csv2】goods：商品エクスポート", type="csv", key="csv2")
+    st.sidebar.markdown("* * * ")
+    ng_keyword = st.sidebar.text_input('除外ワード', value="部品 中古")
+    api_workers = st.sidebar.number_input('同時接続数', min_value=1, max_value=16, value=DEFAULT_WORKERS, step=1)
+    batch_size = st.sidebar.number_input('まとめて検索するJANコード数（1: まとめない）', min_value=1, max_value=BATCH_MAX_SIZE, value=1, step=1)
+    changed_only = st.sidebar.checkbox('前回から変更があった商品のみ出力')
+    refresh_budget = st.sidebar.number_input('1回の検索数の上限（0: すべて検索）', min_value=0, value=0, step=100)
+    st.sidebar.text('※上限を超える場合は、価格変動・粗利率・前回確認からの経過時間で優先度の高い商品から検索')
+
+    # 検索はバックグラウンドのジョブで実行する（再実行・タブを閉じても止まらない）
+    job_queue = shared_queue()
+    job = None
+
+    # ファイルがアップロードされたか確認
+    if uploaded_file1 is not None:
+        master_bytes = uploaded_file1.getvalue()
+        goods_bytes = uploaded_file2.getvalue() if uploaded_file2 is not None else b''
+
+        # 同じアップロード・条件のジョブは、ダウンロードや表示の切り替えによる再実行では登録し直さない
+        csv_memo = SessionMemo('csv検索')
+        memo_key = (run_id_for(master_bytes, goods_bytes, ng_keyword), cache_hours, refresh_cache, refresh_budget, batch_size)
+
+        def submit(refresh):
+            # ジョブを登録し、このアップロード・条件のジョブとして記録する（再検索でも使う）
+            submitted = job_queue.submit(
+                uploaded_file1.name, csv_search, master_bytes, goods_bytes, ng_keyword, APP_ID,
+                cache=response_cache, refresh=refresh, budget=refresh_budget,
+                max_workers=api_workers, limiter=limiter, batch_size=batch_size,
+            )
+            csv_memo.put(memo_key, submitted.id)
+            st.query_params['job'] = submitted.id
+            return submitted
+
+        job_id = csv_memo.get(memo_key)
+        job = job_queue.get(job_id) if job_id is not None else None
+        if job is None:
+            job = submit(refresh_cache)
+
+    # 他のセッション（別のタブ・閉じたタブ）で登録したジョブにも再接続できる
+    jobs = job_queue.jobs()
+    if len(jobs) > 0:
+        job_ids = [j.id for j in jobs]
+        current = job.id if job is not None else st.query_params.get('job')
+        selected_id = st.sidebar.selectbox(
+            'ジョブ',
+            job_ids,
+            index=job_ids.index(current) if current in job_ids else 0,
+            format_func=lambda job_id: f'{job_id} {job_queue.get(job_id).label}（{job_queue.get(job_id).status}）',
+        )
+        job = job_queue.get(selected_id)
+        st.query_params['job'] = job.id
+
+    if job is not None:
+        st.text(f'ジョブ {job.id}: {job.label}（{job.status}）')
+
+        # 失敗したジョブ・取得に失敗した行があるジョブは、今のアップロード・条件で登録し直せる
+        # （途中結果の記録により取得済みの行は検索しない。キャッシュを使わず再取得 をチェックしていても途中結果は消さない）
+        retryable = uploaded_file1 is not None and job.id == csv_memo.get(memo_key) and (
+            job.status == FAILED or (job.status == DONE and len(job.result['failed']) > 0)
+        )
+        if retryable and st.button('再検索（取得できなかった商品のみ）'):
+            submit(False)
+            st.rerun()
+
+        if job.status == FAILED:
+            # エラーメッセージを表示
+            st.error(f"csv1の読み込み中にエラーが発生しました: {job.error}")
+
+        elif job.status != DONE:
+            show_job_progress(job)
+
+        else:
+            outcome = job.result
+            metrics.merge(job.metrics)
+            for note in outcome['notes']:
+                st.text(note)
+
+            # 変更があった商品のみ出力（実行後にチェックしても、検索し直さずに切り替える）
+            df_view = outcome['df_view']
+            csv = outcome['csv']
+            if changed_only:
+                changed = outcome['changed']
+                st.text(f'前回から変更があった商品: {changed.sum()} / {len(changed)} 件')
+                df_view = df_view[changed]
+                csv = outcome['changed_csv']
+
+            # 取得に失敗した行を表示（再検索すると失敗した行のみ検索し直す）
+            failed = outcome['failed']
+            if len(failed) > 0:
+                st.warning(f'{len(failed)} 件の商品で検索結果を取得できませんでした。再検索すると失敗した商品のみ検索し直します。')
+                st.dataframe(pd.DataFrame(failed), hide_index=True)
+
+            # CSVファイルとしてデータを出力するボタン
+            if not outcome['goods']:
+                st.download_button(
+                    label="CSVファイルとしてダウンロード",
+                    data=csv,
+                    file_name='楽天市場検索結果.csv',
+                    mime='text/csv',
+                )
+            else:
+                today_date_8digit = datetime.today().strftime('%Y%m%d')
+
+                st.download_button(
+                    label="CSVファイルをダウンロード",
+                    data=csv,
+                    file_name=f"{today_date_8digit}価格調査結果.csv",
+                    mime='text/csv',
+                )
+
+            # Streamlitで結果を表示（最安時粗利率は小数点第2位まで）
+            with metrics.stage('render'):
+                show_table(df_view, 'csv', {'最安時粗利率': "{:.2f}"})
@@ -0,0 +1,133 @@
+"""個別検索：検索フォームに入力した商品を価格が安い順で出力"""
+import pandas as pd
+import streamlit as st
+
+from pricecheck.cache import cache_key
+from pricecheck.client import APP_ID, IchibaAPIError
+from pricecheck.lookup import DEEP_MAX_PAGES, ITEM_KEY, OWN_SHOP, PAGE_HITS, RESPONSE_PARAMS, deep_search, search
+from pricecheck.memo import SessionMemo
+from pricecheck.modes.common import api_settings
+from pricecheck.pricing import REDUCED_TAX, STANDARD_TAX, point_count
+from pricecheck.results import image_url, link_columns
+from pricecheck.view import show_table
+
+
+def render(metrics):
+    """画面を表示する（処理段階ごとの時間は metrics に記録する）"""
+    cache_hours, refresh_cache, response_cache, limiter = api_settings()
+
+    st.subheader('検索フォームに入力した商品を価格が安い順で出力')
+    st.text('送料は商品個別で設定されている場合のみ（3,980円以上で送料無料の場合は送料別で取得される）')
+
+    # 検索ワード
+    search_keyword = st.sidebar.text_input('検索ワード')
+    orFlag = st.sidebar.radio(
+        "複数ワード入力時（0:AND検索 / 1:OR検索）",
+        (0, 1)
+    )
+    st.sidebar.text('※スペースで複数ワード検索可')
+    ng_keyword = st.sidebar.text_input('除外ワード', value="部品 中古")
+    deep = st.sidebar.checkbox('複数ページを並列に検索（31件以上）')
+    if deep:
+        hits = st.sidebar.number_input(f'検索数（{DEEP_MAX_PAGES * PAGE_HITS}まで・自社店舗を除いた件数）', min_value=1, max_value=DEEP_MAX_PAGES * PAGE_HITS, value=100, step=10)
+    else:
+        hits = st.sidebar.number_input('検索数（30まで）', min_value=1, max_value=30, value=10, step=1)
+    minPrice = st.sidebar.number_input('最小金額', value=1)
+    maxPrice = st.sidebar.number_input('最大金額', value=999999)
+    review = st.sidebar.radio(
+        "レビュー（0:すべて / 1:レビューあり）",
+        (0, 1)
+    )
+
+    tax01 = st.sidebar.checkbox('軽減税率')
+
+    if search_keyword == '':
+        st.text('検索ワードにテキストを入力してください')
+    else:
+        # 入力パラメータ
+        search_params = {
+            "format": "json",
+            "keyword": search_keyword,
+            "NGKeyword": ng_keyword,
+            "orFlag": orFlag,
+            "minPrice": minPrice,
+            "maxPrice": maxPrice,
+            "hasReviewFlag": review,
+            "applicationId": [APP_ID],
+            "availability": 1,
+            "hits": hits,
+            "page": 1,
+            'sort': '+itemPrice',
+            **RESPONSE_PARAMS,
+        }
+
+        # リクエスト
+        try:
+            # 同じ検索条件の結果は、表示の切り替えによる再実行では再取得しない
+            search_memo = SessionMemo('個別検索')
+            memo_key = (cache_key(search_params), deep, cache_hours, refresh_cache)
+            result = search_memo.get(memo_key)
+            if result is None:
+                with metrics.stage('fetch'):
+                    if deep:
+                        # 価格の安い順に必要なページ数だけ取得する
+                        result = deep_search(search_params, hits, cache=response_cache, refresh=refresh_cache, metrics=metrics, limiter=limiter)
+                    else:
+                        result = search(search_params, limiter, cache=response_cache, refresh=refresh_cache, metrics=metrics)
+                search_memo.put(memo_key, result)
+        except IchibaAPIError as e:
+            st.error(f"API エラー: {e}")
+            st.stop()
+
+        # APIエラーチェック
+        if 'error' in result:
+            st.error(f"API エラー: {result.get('error_description', '不明なエラー')}")
+            st.stop()
+
+        # 検索結果チェック
+        if 'Items' not in result or len(result['Items']) == 0:
+            st.warning('検索結果が見つかりませんでした。検索条件を変更してください。')
+            st.stop()
+
+        # 格納（自社店舗を除外）
+        df = pd.DataFrame([item for item in result['Items'] if item.get('shopName') != OWN_SHOP], columns=ITEM_KEY)
+
+        # カラムの順番と名前を変更
+        df = df.reindex(columns=['mediumImageUrls', 'shopName', 'itemName', 'itemUrl', 'itemPrice', 'pointRate', 'postageFlag', 'reviewCount', 'reviewAverage', 'endTime'])
+        df.columns = ['画像', 'ショップ', '商品名', 'URL', '最安値', 'P倍付', '送料', 'レビュー件数', 'レビュー平均点', 'SALE終了']
+
+        # ポイント計算
+        df['ポイント数'] = point_count(df['最安値'], df['P倍付'], REDUCED_TAX if tax01 else STANDARD_TAX)
+
+        df['価格-ポイント'] = df['最安値'] - df['ポイント数']
+
+        # 表示用（画像URLと商品ページへのリンク列）
+        df_view = df[['画像', 'ショップ', '商品名', 'URL', '最安値', '送料', 'ポイント数', '価格-ポイント', 'レビュー件数', 'レビュー平均点', 'SALE終了']].copy()
+        df_view['画像'] = image_url(df_view['画像'])
+
+        # CSV用に画像・商品名にリンクをつける
+        df['画像'], df['商品名'] = link_columns(df)
+
+        df = df[['画像', 'ショップ', '商品名', '最安値', '送料', 'ポイント数', '価格-ポイント', 'レビュー件数', 'レビュー平均点', 'SALE終了']]
+
+        # インデックスをリセット
+        df = df.reset_index(drop=True)
+
+
+
+        st.text('最安値昇順 / URLクリックで商品ページへ')
+        
+        # CSVファイルとしてデータを出力するボタン
+        with metrics.stage('export'):
+            csv = df.to_csv(index=False, encoding='utf-8-sig').encode('utf-8-sig')
+
+        st.download_button(
+            label="CSVファイルとしてダウンロード",
+            data=csv,
+            file_name='楽天市場検索結果.csv',
+            mime='text/csv',
+        )
+        
+        # Streamlitアプリ内でテーブルを表示（レビュー平均点は小数点第2位まで）
+        with metrics.stage('render'):
+            show_table(df_view, 'single', {'レビュー平均点': "{:.2f}"})
@@ -0,0 +1,44 @@
+"""価格更新ファイル作成：csv検索の結果から各モールの価格更新用ファイルを作成"""
+import pandas as pd
+import streamlit as st
+
+from pricecheck.export import BUNDLE_FILE, bundle_bytes
+from pricecheck.journal import run_id_for
+from pricecheck.memo import SessionMemo
+
+
+def render(metrics):
+    """画面を表示する（処理段階ごとの時間は metrics に記録する）"""
+    st.subheader('価格更新用のcsvファイルを作成')
+
+    uploaded_file3 = st.sidebar.file_uploader("csv検索でダウンロードしたファイル", type="csv", key="csv3")
+
+    # ファイルがアップロードされたか確認
+    if uploaded_file3 is not None:
+        try:
+            # 同じファイルから作成済みなら再利用する
+            update_memo = SessionMemo('価格更新ファイル作成')
+            bundle = update_memo.get(run_id_for(uploaded_file3.getvalue()))
+            if bundle is None:
+                with metrics.stage('ingest'):
+                    df00 = pd.read_csv(uploaded_file3, encoding='utf-8')
+
+                # 楽天・Yahoo・自社用データを1ファイルずつ作成し、Shift_JISでZIPにまとめる
+                with metrics.stage('export'):
+                    bundle = bundle_bytes(df00)
+                update_memo.put(run_id_for(uploaded_file3.getvalue()), bundle)
+
+            # ZIPファイルとしてデータを出力するボタン
+            st.download_button(
+                label="楽天・Yahoo・自社用CSVファイル（ZIP）をダウンロード",
+                data=bundle,
+                file_name=BUNDLE_FILE,
+                mime='application/zip',
+            )
+
+            # Streamlitで結果を表示（スタイリングが必要であれば適用）
+            st.write('csvファイルを出力できます')
+
+        except Exception as e:
+            # エラーメッセージを表示
+            st.error(f"csv1の読み込み中にエラーが発生しました: {e}")
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+REDUCED_TAX_CLASS = '軽減税率'
+REDUCED_TAX = 1.08
+STANDARD_TAX = 1.1
+
+# 推奨価格の目標粗利率
+TARGET_MARGIN = 0.2
+TARGET_MARGIN_HIGH_PRICE = 0.17
+
+
+def tax_multiplier(tax_class):
+    """税率区分名から税込倍率の配列を作る（軽減税率: 1.08 / それ以外: 1.1）"""
+    return np.where(np.asarray(tax_class) == REDUCED_TAX_CLASS, REDUCED_TAX, STANDARD_TAX)
+
+
+def point_count(price, point_rate, tax):
+    # 税抜価格の1% × ポイント倍率（四捨五入）
+    return np.round(np.asarray(price) / tax * 0.01 * np.asarray(point_rate)).astype(int)
+
+
+def price_results(df_result, tax=None):
+    """最安値・仕入単価から粗利・推奨価格の列をまとめて計算する
+
+    tax は行ごとの税込倍率。省略時は税率区分名から作る。
+    """
+    if tax is None:
+        tax = tax_multiplier(df_result['税率区分名'])
+    price = df_result['最安値'].to_numpy(dtype=float)
+    cost_with_tax = df_result['仕入単価'].to_numpy(dtype=float) * tax
+
+    df_result['ポイント数'] = point_count(price, df_result['P倍付'], tax)
+    df_result['価格-ポイント'] = df_result['最安値'] - df_result['ポイント数']
+
+    df_result['最安時粗利額'] = (price - np.round(cost_with_tax)).astype(int)
+    df_result['最安時粗利率'] = np.floor((1 - cost_with_tax / price) * 1000) / 1000
+    df_result['価格差'] = df_result['通販単価'] - df_result['最安値']
+    df_result['推奨価格時粗利率'] = 1 - cost_with_tax / price
+
+    df_result['推奨価格'] = np.where(
+        df_result['推奨価格時粗利率'] >= TARGET_MARGIN,
+        price,
+        np.where(
+            df_result['最安時粗利率'] >= 2000,
+            np.ceil(cost_with_tax / (1 - TARGET_MARGIN_HIGH_PRICE)),
+            np.ceil(cost_with_tax / (1 - TARGET_MARGIN)),
+        ),
+    ).astype(int)
+
+    # 変更価格を入力するとExcel上で粗利が計算される式（行番号はヘッダー分+2）
+    df_result['変更価格'] = ''
+    n = pd.Series(df_result.index + 2, index=df_result.index).astype(str)
+    df_result['変更後粗利額'] = '=IF(G' + n + '="課税", O' + n + ' - H' + n + '*1.1, O' + n + ' - H' + n + '*1.08)'
+    df_result['変更後粗利率'] = '=ROUNDDOWN(IF(G' + n + '="課税", (1-(H' + n + ')*1.1/O' + n + '), (1-(H' + n + ')*1.08/O' + n + ')),2)'
+    return df_result
+
@@ -0,0 +1,116 @@
+import os
+import sqlite3
+import threading
+import time
+
+from pricecheck.cache import DEFAULT_PATH as CACHE_PATH
+from pricecheck.client import APP_ID
+from pricecheck.lookup import DEFAULT_RATE
+
+DEFAULT_PATH = os.path.join(os.path.dirname(CACHE_PATH), 'quota.sqlite3')
+
+# セッション・ジョブごとに、予約して待っていられる枠の数
+DEFAULT_MAX_PENDING = 1
+
+
+def app_ids_from_env():
+    # 環境変数 RAKUTEN_APP_IDS（カンマ区切り）で複数のアプリIDを登録できる
+    value = os.environ.get('RAKUTEN_APP_IDS') or os.environ.get('RAKUTEN_APP_ID') or str(APP_ID)
+    return [app_id.strip() for app_id in value.split(',') if app_id.strip()]
+
+
+def rate_from_env():
+    # 環境変数 RAKUTEN_API_RATE でアプリIDごとの上限（回/秒）を変更できる
+    return float(os.environ.get('RAKUTEN_API_RATE') or DEFAULT_RATE)
+
+
+class QuotaGovernor:
+    """すべての検索APIの呼び出しを、アプリIDごとの上限内で空いている順に割り当てる
+
+    呼び出しごとに、最も早く空くアプリIDの枠を先着順に予約する。
+    path を渡すと予約をSQLiteに記録し、同じ path を使う他のプロセス（他のStreamlitサーバー・CLI）とも上限を共有する。
+    """
+
+    def __init__(self, app_ids, rate=DEFAULT_RATE, path=None):
+        self.app_ids = [str(app_id) for app_id in app_ids]
+        self.rate = float(rate)
+        self.interval = 1 / self.rate
+        self._next = {app_id: 0.0 for app_id in self.app_ids}
+        self._lock = threading.Lock()
+        self._conn = None
+        if path is not None:
+            if path != ':memory:':
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS slots (app_id TEXT PRIMARY KEY, next_at REAL NOT NULL)')
+
+    @property
+    def total_rate(self):
+        return self.rate * len(self.app_ids)
+
+    def reserve(self):
+        """最も早く空くアプリIDの枠を予約し、(アプリID, 呼び出してよい時刻) を返す"""
+        with self._lock:
+            if self._conn is None:
+                return self._take(self._next, time.time())
+
+            # 他のプロセスと同時に予約しないよう、書き込みロックを取ってから読む
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                slots = dict(self._conn.execute('SELECT app_id, next_at FROM slots').fetchall())
+                app_id, at = self._take(slots, time.time())
+                self._conn.execute('INSERT OR REPLACE INTO slots (app_id, next_at) VALUES (?, ?)', (app_id, slots[app_id]))
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            return app_id, at
+
+    def _take(self, slots, now):
+        app_id = min(self.app_ids, key=lambda a: slots.get(a, 0.0))
+        at = max(now, slots.get(app_id, 0.0))
+        slots[app_id] = at + self.interval
+        return app_id, at
+
+    def acquire(self):
+        # 予約した時刻まで待ち、使うアプリIDを返す
+        app_id, at = self.reserve()
+        wait = at - time.time()
+        if wait > 0:
+            time.sleep(wait)
+        return app_id
+
+    def share(self, max_pending=DEFAULT_MAX_PENDING):
+        """セッション・ジョブごとの呼び出し口（limiter として渡す）"""
+        return QuotaShare(self, max_pending)
+
+
+class QuotaShare:
+    """QuotaGovernor の枠を1つのセッション・ジョブで使う
+
+    予約して待っている枠を max_pending 件までに抑え、同時接続数の多いジョブが先の枠をまとめて取らないようにする。
+    他のセッションの呼び出しは、実行中のジョブ1つにつき max_pending 件の後に割り当てられる。
+    """
+
+    def __init__(self, governor, max_pending=DEFAULT_MAX_PENDING):
+        self.governor = governor
+        self._pending = threading.BoundedSemaphore(max_pending)
+
+    def acquire(self):
+        # 予約した時刻に呼び出せるようになった時点で、次の予約を受け付ける
+        with self._pending:
+            return self.governor.acquire()
+
+
+_shared_governor = None
+_shared_lock = threading.Lock()
+
+
+def shared_governor():
+    # サーバー内のすべてのセッションで1つの割り当てを共有する（CLIなど他のプロセスともSQLiteで共有）
+    global _shared_governor
+    with _shared_lock:
+        if _shared_governor is None:
+            _shared_governor = QuotaGovernor(app_ids_from_env(), rate=rate_from_env(), path=DEFAULT_PATH)
+        return _shared_governor
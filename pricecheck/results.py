@@ -0,0 +1,53 @@
+import pandas as pd
+
+from pricecheck.pricing import price_results
+
+# 価格調査結果CSVの列（変更後粗利の式は G・H・O 列を参照するため並びを変えない）
+RESULT_COLUMNS = ['商品コード', '画像', 'ショップ', '商品名', '最安値', '送料', '税率区分名', '仕入単価', '通販単価', '価格差', '送料区分', '最安時粗利額', '最安時粗利率', '推奨価格', '変更価格', '変更後粗利額', '変更後粗利率']
+VIEW_COLUMNS = ['商品コード', '画像', 'ショップ', '商品名', 'URL', '最安値', '送料', '税率区分名', '仕入単価', '通販単価', '価格差', '送料区分', '最安時粗利額', '最安時粗利率', '推奨価格']
+
+
+def build_results(item_columns):
+    """検索結果の列から、表示・CSV用の列名にそろえて価格計算まで行う"""
+    df_result = pd.DataFrame(item_columns)
+
+    # カラムの順番と名前を変更
+    df_result = df_result.reindex(columns=['商品コード', 'JANコード', 'mediumImageUrls', 'shopName', 'itemName', 'itemUrl', 'itemPrice', 'pointRate', 'postageFlag', 'endTime', '仕入単価', '通販単価', '税率区分名', '商品分類6名'])
+    df_result.columns = ['商品コード', 'JANコード', '画像', 'ショップ', '商品名', 'URL', '最安値', 'P倍付', '送料', 'SALE終了', '仕入単価', '通販単価', '税率区分名', '送料区分']
+
+    # ポイント・粗利・推奨価格の計算
+    return price_results(df_result)
+
+
+def select_rows(df_result, mask):
+    """build_results の結果を行で絞り込む（変更後粗利の式の行番号を振り直す）"""
+    return price_results(df_result[mask].reset_index(drop=True))
+
+
+def image_url(images):
+    # mediumImageUrls の先頭の画像URL（なければ空文字）。0件でも文字列の列として返す
+    return images.map(lambda v: v[0] if isinstance(v, list) and len(v) > 0 and isinstance(v[0], str) else '').astype(str)
+
+
+def link_columns(df):
+    """CSV出力用に、画像と商品名へ商品ページのリンクを付けたHTMLを作る"""
+    url = df['URL'].astype(str)
+    image = image_url(df['画像'])
+    image_html = ('<a href="' + url + '" target="_blank"><img src="' + image + '" width="100"></a>').where(image != '', '')
+    name_html = '<a href="' + url + '" target="_blank">' + df['商品名'].astype(str) + '</a>'
+    return image_html, name_html
+
+
+def split_results(df_result):
+    """build_results の結果を、表示用（画像URL・リンク列あり）とCSV用に分ける"""
+    # 0件（変更があった商品のみ出力で変更なしなど）は列だけの表を返す（CSVはヘッダーのみ）
+    if len(df_result) == 0:
+        return pd.DataFrame(columns=VIEW_COLUMNS), pd.DataFrame(columns=RESULT_COLUMNS)
+
+    df_view = df_result[VIEW_COLUMNS].copy()
+    df_view['画像'] = image_url(df_view['画像'])
+
+    # CSV用に画像・商品名にリンクをつける
+    df_csv = df_result.copy()
+    df_csv['画像'], df_csv['商品名'] = link_columns(df_csv)
+    return df_view, df_csv[RESULT_COLUMNS]
@@ -0,0 +1,52 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from pricecheck.pricing import TARGET_MARGIN
+
+# 優先度の重み（価格変動・粗利率の危険度・前回確認からの経過時間）
+VOLATILITY_WEIGHT = 0.4
+MARGIN_RISK_WEIGHT = 0.3
+STALENESS_WEIGHT = 0.3
+
+# 粗利率が目標から この幅以内なら危険度が上がる（目標ちょうどで1）
+MARGIN_RISK_WIDTH = 0.1
+# この時間確認していなければ経過時間の点数は最大
+STALE_SECONDS = 7 * 24 * 60 * 60
+
+
+def priority(df, stats, now=None):
+    """商品マスタの各行の再検索の優先度（0〜1、一度も検索していない商品は inf。見つからなかった商品は確認済み）
+
+    stats は PriceHistory.stats() の結果。
+    """
+    now = now or time.time()
+    history = stats.reindex(df['商品コード'].astype(str))
+
+    # 価格変動: 確認したうち最安値が変わっていた割合
+    volatility = (history['changes'] / (history['checks'] - 1).clip(lower=1)).fillna(0).to_numpy()
+    # 粗利率の危険度: 推奨価格の基準（粗利率0.2）に近いほど高い
+    margin_risk = np.clip(1 - np.abs(history['margin_rate'] - TARGET_MARGIN) / MARGIN_RISK_WIDTH, 0, 1).fillna(0).to_numpy()
+    # 経過時間
+    staleness = np.clip((now - history['last_observed']) / STALE_SECONDS, 0, 1).to_numpy()
+
+    score = VOLATILITY_WEIGHT * volatility + MARGIN_RISK_WEIGHT * margin_risk + STALENESS_WEIGHT * staleness
+    score = np.where(history['checks'].isna().to_numpy(), np.inf, score)
+    return pd.Series(score, index=df.index)
+
+
+def plan_refresh(df, stats, budget, now=None):
+    """優先度の高い商品から、検索回数が budget 以内になるように商品マスタの行を選ぶ
+
+    同じJANコードの行は1回の検索にまとめられるため、JANコードの数で数える。
+    戻り値は選ばれた行（マスタの行順のまま）。
+    """
+    score = priority(df, stats, now)
+    jan = df['JANコード'].astype(str)
+
+    # JANコードごとに最も高い優先度で並べ、上位 budget 件を検索する（同点はマスタの順）
+    jan_score = score.groupby(jan, sort=False).max()
+    order = np.argsort(-jan_score.to_numpy(), kind='stable')
+    selected = jan_score.index[order[:budget]]
+    return df[jan.isin(selected)]
@@ -0,0 +1,39 @@
+import math
+
+import streamlit as st
+
+from pricecheck.lookup import OWN_SHOP
+
+PAGE_SIZES = [50, 100, 200, 500]
+
+
+def highlight_shop(row):
+    # 自社店舗の行に色を付ける（結果比較では今回のショップ）
+    shop = row.get('ショップ', row.get('ショップ(今回)'))
+    return ['background-color: #ffe0ef;' if shop == OWN_SHOP else '' for _ in row]
+
+
+def show_table(df, key, formats=None):
+    """検索結果をページ単位で表示する（スタイル適用・画像読み込みは表示中のページのみ）
+
+    df の 画像 列は画像URL、URL 列は商品ページのURL。
+    """
+    if len(df) == 0:
+        return
+
+    col1, col2, _ = st.columns([1, 1, 4])
+    page_size = col1.selectbox('表示件数', PAGE_SIZES, key=f'{key}_page_size')
+    pages = math.ceil(len(df) / page_size)
+    page = col2.number_input(f'ページ（全{pages}ページ）', min_value=1, max_value=pages, value=1, step=1, key=f'{key}_page')
+
+    page_df = df.iloc[(page - 1) * page_size:page * page_size]
+    styled_df = page_df.style.apply(highlight_shop, axis=1).format(formats or {})
+
+    st.dataframe(
+        styled_df,
+        hide_index=True,
+        column_config={
+            '画像': st.column_config.ImageColumn('画像'),
+            'URL': st.column_config.LinkColumn('URL', display_text='商品ページ'),
+        },
+    )